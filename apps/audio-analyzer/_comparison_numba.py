@@ -0,0 +1,159 @@
+"""
+Numba Comparison Kernels
+
+Compiled makhraj/timing scoring for recitation segments. MFCC means and
+variances are read from prefix sums (see AudioFeatures.mfcc_cumsum), so
+each segment costs O(n_mfcc) regardless of its length. Segments are
+scored serially: there are only a handful per call (segments or words), so
+a parallel loop would spend more on thread dispatch than on the work.
+Voiced-pitch statistics for issue detection are read from prefix sums in
+the same way.
+"""
+
+import numpy as np
+from numba import njit
+
+# Floor for cosine denominators; variance vectors can legitimately be ~1e-6
+_MIN_NORM_PRODUCT = 1e-30
+
+
+@njit(cache=True, fastmath=True)
+def makhraj_score(
+    user_csum, user_sq_csum, user_start, user_end,
+    ref_csum, ref_sq_csum, ref_start, ref_end
+):
+    """
+    Makhraj score 0-100 for one pair of half-open frame ranges.
+
+    Combines the cosine similarity of the MFCC means (weight 0.7) and of
+    the MFCC variances (weight 0.3), then maps the result to 0-100.
+    Empty ranges get a neutral 50.
+    """
+    user_len = user_end - user_start
+    ref_len = ref_end - ref_start
+    if user_len <= 0 or ref_len <= 0:
+        return 50.0
+
+    mean_dot = 0.0
+    user_mean_sq = 0.0
+    ref_mean_sq = 0.0
+    var_dot = 0.0
+    user_var_sq = 0.0
+    ref_var_sq = 0.0
+
+    for k in range(user_csum.shape[1]):
+        user_mean = (user_csum[user_end, k] - user_csum[user_start, k]) / user_len
+        ref_mean = (ref_csum[ref_end, k] - ref_csum[ref_start, k]) / ref_len
+
+        user_var = (user_sq_csum[user_end, k] - user_sq_csum[user_start, k]) / user_len
+        ref_var = (ref_sq_csum[ref_end, k] - ref_sq_csum[ref_start, k]) / ref_len
+        user_var = max(user_var - user_mean * user_mean, 0.0) + 1e-6
+        ref_var = max(ref_var - ref_mean * ref_mean, 0.0) + 1e-6
+
+        mean_dot += user_mean * ref_mean
+        user_mean_sq += user_mean * user_mean
+        ref_mean_sq += ref_mean * ref_mean
+        var_dot += user_var * ref_var
+        user_var_sq += user_var * user_var
+        ref_var_sq += ref_var * ref_var
+
+    # Cosine similarity (1 = identical, 0 = orthogonal, -1 = opposite).
+    # Squared norms are accumulated alongside the dot product, so each
+    # similarity needs a single sqrt of their product.
+    similarity = mean_dot / max(np.sqrt(user_mean_sq * ref_mean_sq), _MIN_NORM_PRODUCT)
+    var_similarity = var_dot / max(np.sqrt(user_var_sq * ref_var_sq), _MIN_NORM_PRODUCT)
+
+    # Combine similarities
+    combined = 0.7 * similarity + 0.3 * var_similarity
+
+    # Convert to 0-100 scale
+    # Similarity typically ranges from 0.5 to 1.0 for reasonable recitations
+    return min(100.0, max(0.0, (combined - 0.3) / 0.7 * 100))
+
+
+@njit(cache=True, error_model='numpy')
+def timing_score(user_duration, ref_duration):
+    """
+    Timing score 0-100 from user and reference durations.
+
+    Score depends on how close the duration ratio is to 1.0: within 0.8-1.2
+    scores 80-100 and within 0.5-1.5 scores 50-80 (both lose 100 points per
+    unit of deviation), anything further off is too fast or too slow and
+    scores 0-50. A zero reference duration gets a neutral 50.
+
+    Both linear pieces are evaluated and one is selected, so the batched
+    segment loop compiles to selects instead of data-dependent branches.
+    """
+    has_ref = ref_duration > 0
+
+    # Ratio of durations (1.0 = perfect match)
+    deviation = abs(user_duration / (ref_duration if has_ref else 1.0) - 1.0)
+
+    close = 100 - deviation * 100
+    far = 50 - deviation * 25
+    score = min(100.0, max(0.0, close if deviation <= 0.5 else far))
+
+    return score if has_ref else 50.0
+
+
+@njit(cache=True, fastmath=True)
+def score_segments(
+    user_csum, user_sq_csum, ref_csum, ref_sq_csum,
+    user_starts, user_ends, ref_starts, ref_ends,
+    user_durations, ref_durations,
+    out_makhraj, out_timing
+):
+    """
+    Makhraj and timing scores for many segments, written into out_makhraj
+    and out_timing. Frame ranges are half-open; durations are in seconds.
+    """
+    for i in range(user_starts.shape[0]):
+        out_makhraj[i] = makhraj_score(
+            user_csum, user_sq_csum, user_starts[i], user_ends[i],
+            ref_csum, ref_sq_csum, ref_starts[i], ref_ends[i]
+        )
+        out_timing[i] = timing_score(user_durations[i], ref_durations[i])
+
+
+@njit(cache=True)
+def voiced_pitch_stats(
+    pitch, count_csum, pitch_csum, pitch_sq_csum,
+    starts, ends,
+    out_count, out_mean, out_std, out_max_jump
+):
+    """
+    Pitch statistics over the voiced frames (pitch > 0) of many half-open
+    frame ranges.
+
+    Count, mean and standard deviation come from the voiced prefix sums in
+    O(1) per range. The largest absolute change between consecutive voiced
+    frames is found in one fused diff/abs/max pass over the range.
+    All statistics are 0 for unvoiced ranges.
+    """
+    for i in range(starts.shape[0]):
+        start = starts[i]
+        end = ends[i]
+
+        count = int(count_csum[end] - count_csum[start])
+        out_count[i] = count
+        if count == 0:
+            out_mean[i] = 0.0
+            out_std[i] = 0.0
+            out_max_jump[i] = 0.0
+            continue
+
+        mean = (pitch_csum[end] - pitch_csum[start]) / count
+        mean_sq = (pitch_sq_csum[end] - pitch_sq_csum[start]) / count
+        out_mean[i] = mean
+        out_std[i] = np.sqrt(max(mean_sq - mean * mean, 0.0))
+
+        # Unvoiced frames are skipped, so jumps span unvoiced gaps
+        max_jump = 0.0
+        prev = 0.0
+        for j in range(start, end):
+            p = pitch[j]
+            if p > 0:
+                if prev > 0:
+                    max_jump = max(max_jump, abs(p - prev))
+                prev = p
+        out_max_jump[i] = max_jump
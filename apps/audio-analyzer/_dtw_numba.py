@@ -0,0 +1,281 @@
+"""
+Numba DTW Kernel
+
+Compiled symmetric2 Dynamic Time Warping over MFCC frame sequences.
+Only two rows of accumulated cost are kept in memory; the path is
+recovered from an int8 step matrix instead of the full cost matrix.
+The DP fill can be restricted to a per-row window of reference frames
+(e.g. a Sakoe-Chiba band), which is also what the FastDTW-style
+multiresolution solver uses to refine coarse paths.
+
+Also holds the small compiled helpers that post-process warping paths.
+"""
+
+import numpy as np
+from numba import njit
+
+# Backtrace step codes
+STEP_DIAG = 0  # from (i-1, j-1)
+STEP_LEFT = 1  # from (i, j-1)
+STEP_UP = 2    # from (i-1, j)
+
+# fastmath without 'nnan'/'ninf': the recurrence relies on inf comparisons
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# FastDTW recursion stops once either sequence is this short
+FASTDTW_MIN_FRAMES = 32
+
+
+def euclidean_cost_matrix(U: np.ndarray, R: np.ndarray) -> np.ndarray:
+    """
+    All pairwise Euclidean distances between the rows of U and R.
+
+    Uses ||u - r||^2 = ||u||^2 + ||r||^2 - 2 u.r so the bulk of the work is
+    a single matrix product in the inputs' precision (float32 for MFCC).
+    Both inputs are first centered on a shared offset, which leaves the
+    distances unchanged but keeps the norms small enough that float32
+    cancellation error stays negligible.
+    """
+    offset = U.mean(axis=0)
+    U = U - offset
+    R = R - offset
+
+    sq = np.einsum('ij,ij->i', U, U)[:, None] + np.einsum('ij,ij->i', R, R)[None, :]
+    sq -= 2 * (U @ R.T)
+    np.maximum(sq, 0, out=sq)
+    return np.sqrt(sq, out=sq)
+
+
+def full_window(n: int, m: int) -> tuple[np.ndarray, np.ndarray]:
+    """Window covering every (i, j) cell, i.e. unconstrained DTW"""
+    return np.zeros(n, dtype=np.int64), np.full(n, m - 1, dtype=np.int64)
+
+
+def sakoe_chiba_window(n: int, m: int, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sakoe-Chiba band around the diagonal from (0, 0) to (n-1, m-1).
+
+    Row i may only visit reference frames j with |i * (m-1)/(n-1) - j| <= window.
+    The window is widened to the diagonal slope if needed so that
+    consecutive rows always overlap and a path exists.
+
+    Returns:
+        Tuple of (j_lo, j_hi) inclusive column bounds per row
+    """
+    if n == 1 or m == 1:
+        return full_window(n, m)
+
+    slope = (m - 1) / (n - 1)
+    window = max(window, int(np.ceil(slope)))
+    center = np.arange(n) * slope
+    j_lo = np.maximum(0, np.floor(center - window)).astype(np.int64)
+    j_hi = np.minimum(m - 1, np.ceil(center + window)).astype(np.int64)
+    return j_lo, j_hi
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def dtw_symmetric2(U, R, j_lo, j_hi, cost_matrix=None):
+    """
+    Align two feature sequences with the symmetric2 step pattern.
+
+    Local cost is the Euclidean distance between frames. Diagonal steps
+    are weighted 2, horizontal and vertical steps 1 (same as dtw-python's
+    'symmetric2'), so the distance is normalizable by N + M.
+
+    Only cells with j_lo[i] <= j <= j_hi[i] are evaluated; every other
+    cell has infinite cost, so the backtrace stays inside the window.
+
+    U and R should be C-contiguous (frames as rows) so the per-cell
+    distance loop reads memory linearly.
+
+    Args:
+        U: User features, shape (n_frames, n_dims)
+        R: Reference features, shape (m_frames, n_dims)
+        j_lo: First reference frame to evaluate for each user frame
+        j_hi: Last reference frame to evaluate for each user frame
+        cost_matrix: Optional precomputed local costs, shape (n_frames, m_frames).
+                     When omitted, distances are computed inside the window only.
+
+    Returns:
+        Tuple of (index1, index2, distance) where index1/index2 are the
+        user/reference frame indices along the warping path
+    """
+    n = U.shape[0]
+    m = R.shape[0]
+    n_dims = U.shape[1]
+
+    prev = np.full(m, np.inf)
+    curr = np.full(m, np.inf)
+    steps = np.empty((n, m), dtype=np.int8)
+
+    for i in range(n):
+        # curr still holds row i-2; clear it so stale cells read as inf
+        if i >= 2:
+            curr[j_lo[i - 2]:j_hi[i - 2] + 1] = np.inf
+
+        for j in range(j_lo[i], j_hi[i] + 1):
+            if cost_matrix is None:
+                cost = 0.0
+                for k in range(n_dims):
+                    d = U[i, k] - R[j, k]
+                    cost += d * d
+                cost = np.sqrt(cost)
+            else:
+                cost = cost_matrix[i, j]
+
+            if i == 0 and j == 0:
+                curr[j] = cost
+                steps[i, j] = STEP_DIAG
+                continue
+
+            # Ties resolve in dtw-python's order: diagonal, left, up
+            best = np.inf
+            step = STEP_DIAG
+            if i > 0 and j > 0:
+                best = prev[j - 1] + 2.0 * cost
+            if j > 0 and curr[j - 1] + cost < best:
+                best = curr[j - 1] + cost
+                step = STEP_LEFT
+            if i > 0 and prev[j] + cost < best:
+                best = prev[j] + cost
+                step = STEP_UP
+
+            curr[j] = best
+            steps[i, j] = step
+
+        prev, curr = curr, prev
+
+    distance = prev[m - 1]
+
+    # Backtrace from the end of both sequences
+    index1 = np.empty(n + m - 1, dtype=np.int32)
+    index2 = np.empty(n + m - 1, dtype=np.int32)
+    i = n - 1
+    j = m - 1
+    k = 0
+    while True:
+        index1[k] = i
+        index2[k] = j
+        k += 1
+        if i == 0 and j == 0:
+            break
+        step = steps[i, j]
+        if step == STEP_DIAG:
+            i -= 1
+            j -= 1
+        elif step == STEP_LEFT:
+            j -= 1
+        else:
+            i -= 1
+
+    return index1[:k][::-1].copy(), index2[:k][::-1].copy(), distance
+
+
+def project_window(
+    coarse_index1: np.ndarray,
+    coarse_index2: np.ndarray,
+    n: int,
+    m: int,
+    radius: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project a path found at half resolution onto the full-resolution grid.
+
+    Each coarse cell (i, j) covers fine rows 2i..2i+1 and columns 2j..2j+1;
+    the covered area is then widened by `radius` cells in both directions.
+
+    Returns:
+        Tuple of (j_lo, j_hi) inclusive column bounds per fine row
+    """
+    n_coarse = (n + 1) // 2
+    rows = np.arange(n_coarse)
+
+    # Warping paths are monotonic, so each coarse row is a contiguous run
+    first = np.searchsorted(coarse_index1, rows, side='left')
+    last = np.searchsorted(coarse_index1, rows, side='right') - 1
+
+    fine_rows = np.arange(n) // 2
+    j_lo = 2 * coarse_index2[first][fine_rows].astype(np.int64)
+    j_hi = 2 * coarse_index2[last][fine_rows].astype(np.int64) + 1
+
+    # Bounds are non-decreasing, so the widest neighbour within the
+    # radius is always the one furthest away
+    fine = np.arange(n)
+    j_lo = j_lo[np.maximum(0, fine - radius)] - radius
+    j_hi = j_hi[np.minimum(n - 1, fine + radius)] + radius
+
+    return np.maximum(j_lo, 0), np.minimum(j_hi, m - 1)
+
+
+def fastdtw_mfcc(U: np.ndarray, R: np.ndarray, radius: int = 10):
+    """
+    Multiresolution (FastDTW-style) approximation of dtw_symmetric2.
+
+    Both sequences are downsampled by 2 recursively, the coarsest level is
+    solved exactly, and each finer level only evaluates cells within
+    `radius` of the projected coarse path. Runtime is roughly linear in
+    the sequence lengths instead of quadratic.
+
+    Args:
+        U: User features, shape (n_frames, n_dims)
+        R: Reference features, shape (m_frames, n_dims)
+        radius: Extra frames searched around the projected path
+
+    Returns:
+        Same as dtw_symmetric2: (index1, index2, distance)
+    """
+    n, m = len(U), len(R)
+    U = np.ascontiguousarray(U)
+    R = np.ascontiguousarray(R)
+
+    if n <= FASTDTW_MIN_FRAMES or m <= FASTDTW_MIN_FRAMES:
+        j_lo, j_hi = full_window(n, m)
+        return dtw_symmetric2(U, R, j_lo, j_hi)
+
+    coarse_index1, coarse_index2, _ = fastdtw_mfcc(U[::2], R[::2], radius)
+    j_lo, j_hi = project_window(coarse_index1, coarse_index2, n, m, radius)
+
+    return dtw_symmetric2(U, R, j_lo, j_hi)
+
+
+@njit(cache=True)
+def path_time_stretch(path_user, path_ref, user_frame_time, ref_frame_time, n_segments):
+    """
+    Ratio of user to reference time spanned by each of n_segments equal
+    chunks of the warping path (1.0 where the reference span is empty).
+    """
+    path_len = path_user.shape[0]
+    segment_size = path_len // n_segments
+    stretch = np.ones(n_segments)
+
+    for i in range(n_segments):
+        start = i * segment_size
+        end = min(start + segment_size, path_len - 1)
+        ref_time = (path_ref[end] - path_ref[start]) * ref_frame_time
+        if ref_time > 0:
+            stretch[i] = (path_user[end] - path_user[start]) * user_frame_time / ref_time
+
+    return stretch
+
+
+@njit(cache=True)
+def path_segment_bounds(path_user, path_ref, n_segments):
+    """
+    Split a warping path into n_segments equal chunks.
+
+    Returns int array of shape (n_segments, 4) holding
+    (user_start, user_end, ref_start, ref_end) per segment, ends inclusive.
+    """
+    path_len = path_user.shape[0]
+    segment_size = path_len // n_segments
+    bounds = np.empty((n_segments, 4), dtype=np.int64)
+
+    for i in range(n_segments):
+        start = i * segment_size
+        end = min(start + segment_size - 1, path_len - 1)
+        bounds[i, 0] = path_user[start]
+        bounds[i, 1] = path_user[end]
+        bounds[i, 2] = path_ref[start]
+        bounds[i, 3] = path_ref[end]
+
+    return bounds
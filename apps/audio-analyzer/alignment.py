@@ -6,18 +6,29 @@ frame-by-frame comparison despite different speaking speeds.
 """
 
 from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
 
 import numpy as np
-from dtw import dtw
 
 from features import AudioFeatures
+from _dtw_numba import (
+    dtw_symmetric2,
+    euclidean_cost_matrix,
+    fastdtw_mfcc,
+    full_window,
+    path_segment_bounds,
+    path_time_stretch,
+    sakoe_chiba_window,
+)
 
 
 @dataclass
 class AlignmentResult:
     """Result of DTW alignment between two audio recordings"""
-    # Alignment path: pairs of (user_frame_idx, reference_frame_idx)
-    path: list[tuple[int, int]]
+    # Alignment path as parallel int32 arrays of user/reference frame indices
+    path_user: np.ndarray
+    path_ref: np.ndarray
 
     # DTW distance (lower = more similar overall)
     distance: float
@@ -25,19 +36,31 @@ class AlignmentResult:
     # Normalized distance (by path length)
     normalized_distance: float
 
-    # Mapping from user frames to reference frames
-    user_to_ref: dict[int, int]
+    # Mapping from user frames to reference frames (int32, -1 = unmapped)
+    user_to_ref: np.ndarray
 
-    # Mapping from reference frames to user frames
-    ref_to_user: dict[int, int]
+    # Mapping from reference frames to user frames (int32, -1 = unmapped)
+    ref_to_user: np.ndarray
 
     # Time stretching factor per segment (>1 means user is slower)
     time_stretch: np.ndarray
 
+    @cached_property
+    def path(self) -> list[tuple[int, int]]:
+        """
+        Alignment path as pairs of (user_frame_idx, reference_frame_idx).
+
+        Built on first access only; prefer path_user/path_ref in new code.
+        """
+        return list(zip(self.path_user.tolist(), self.path_ref.tolist()))
+
 
 def align_audio_features(
     user_features: AudioFeatures,
-    ref_features: AudioFeatures
+    ref_features: AudioFeatures,
+    window_ratio: Optional[float] = 0.1,
+    algorithm: str = 'dtw',
+    radius: int = 10
 ) -> AlignmentResult:
     """
     Align user audio to reference audio using DTW on MFCC features.
@@ -48,51 +71,93 @@ def align_audio_features(
     Args:
         user_features: Features extracted from user's recording
         ref_features: Features extracted from reference Qari audio
+        window_ratio: Sakoe-Chiba band width as a fraction of the shorter
+                      recording (None = unconstrained DTW)
+        algorithm: 'dtw' for exact (banded) DTW, or 'fastdtw' for the
+                   multiresolution approximation suited to long recitations
+        radius: Search radius around the projected path for 'fastdtw'
 
     Returns:
         AlignmentResult with frame mappings and distance metrics
     """
-    # Use MFCC for alignment (transpose to have frames as rows)
-    user_mfcc = user_features.mfcc.T  # Shape: (n_frames, n_mfcc)
-    ref_mfcc = ref_features.mfcc.T
-
-    # Run DTW
-    alignment = dtw(
-        user_mfcc,
-        ref_mfcc,
-        keep_internals=True,
-        step_pattern='symmetric2'  # Allows for flexible time warping
-    )
+    # Use MFCC for alignment, with frames as contiguous float32 rows
+    # for the GEMM and the DTW kernels
+    user_mfcc = user_features.mfcc_t  # Shape: (n_frames, n_mfcc)
+    ref_mfcc = ref_features.mfcc_t
+
+    n_user, n_ref = len(user_mfcc), len(ref_mfcc)
+
+    # Run DTW (symmetric2 step pattern allows for flexible time warping)
+    if algorithm == 'fastdtw':
+        index1, index2, distance = fastdtw_mfcc(user_mfcc, ref_mfcc, radius)
+    elif algorithm == 'dtw':
+        # Constrain the warp to a band around the diagonal; recitations rarely
+        # differ in speed enough to need the full n_user x n_ref matrix
+        if window_ratio is None:
+            j_lo, j_hi = full_window(n_user, n_ref)
+
+            # Every cell is visited: compute all frame-pair distances in one
+            # matrix product so the DP fill only does the three-way min
+            cost_matrix = euclidean_cost_matrix(user_mfcc, ref_mfcc)
+        else:
+            window = int(window_ratio * min(n_user, n_ref))
+            j_lo, j_hi = sakoe_chiba_window(n_user, n_ref, window)
 
-    # Extract alignment path
-    path = list(zip(alignment.index1, alignment.index2))
+            # Only the band is visited: let the kernel compute those
+            # distances instead of materializing n_user x n_ref floats
+            cost_matrix = None
 
-    # Build frame mappings
-    user_to_ref = {}
-    ref_to_user = {}
+        index1, index2, distance = dtw_symmetric2(
+            user_mfcc, ref_mfcc, j_lo, j_hi, cost_matrix
+        )
+    else:
+        raise ValueError(f"Unknown DTW algorithm: {algorithm}")
 
-    for user_idx, ref_idx in path:
-        # For user->ref, keep the last mapping (in case of many-to-one)
-        user_to_ref[user_idx] = ref_idx
-        # For ref->user, keep the first mapping
-        if ref_idx not in ref_to_user:
-            ref_to_user[ref_idx] = user_idx
+    # Build frame mappings as lookup tables
+    user_to_ref, ref_to_user = build_frame_mappings(index1, index2, n_user, n_ref)
 
     # Calculate time stretching per segment
-    time_stretch = compute_time_stretch(path, user_features, ref_features)
+    time_stretch = compute_time_stretch(index1, index2, user_features, ref_features)
 
     return AlignmentResult(
-        path=path,
-        distance=alignment.distance,
-        normalized_distance=alignment.normalizedDistance,
+        path_user=index1,
+        path_ref=index2,
+        distance=float(distance),
+        normalized_distance=float(distance) / (n_user + n_ref),
         user_to_ref=user_to_ref,
         ref_to_user=ref_to_user,
         time_stretch=time_stretch
     )
 
 
+def build_frame_mappings(
+    index1: np.ndarray,
+    index2: np.ndarray,
+    n_user_frames: int,
+    n_ref_frames: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build user->ref and ref->user frame lookup tables from a DTW path.
+
+    For user->ref the last mapping wins (in case of many-to-one),
+    for ref->user the first mapping wins. Frames not on the path map to -1.
+    """
+    user_to_ref = np.full(n_user_frames, -1, dtype=np.int32)
+    ref_to_user = np.full(n_ref_frames, -1, dtype=np.int32)
+
+    # np.unique returns the first occurrence, so reverse to get the last
+    user_idx, last = np.unique(index1[::-1], return_index=True)
+    user_to_ref[user_idx] = index2[::-1][last]
+
+    ref_idx, first = np.unique(index2, return_index=True)
+    ref_to_user[ref_idx] = index1[first]
+
+    return user_to_ref, ref_to_user
+
+
 def compute_time_stretch(
-    path: list[tuple[int, int]],
+    path_user: np.ndarray,
+    path_ref: np.ndarray,
     user_features: AudioFeatures,
     ref_features: AudioFeatures,
     segment_frames: int = 20
@@ -104,7 +169,8 @@ def compute_time_stretch(
     Values < 1 mean user is faster than reference.
 
     Args:
-        path: DTW alignment path
+        path_user: User frame indices along the DTW path
+        path_ref: Reference frame indices along the DTW path
         user_features: User audio features
         ref_features: Reference audio features
         segment_frames: Number of frames per segment for analysis
@@ -112,39 +178,19 @@ def compute_time_stretch(
     Returns:
         Array of time stretch factors
     """
-    if len(path) < 2:
+    path_len = len(path_user)
+    if path_len < 2:
         return np.array([1.0])
 
     # Group path into segments
-    n_segments = max(1, len(path) // segment_frames)
-    segment_size = len(path) // n_segments
+    n_segments = max(1, path_len // segment_frames)
 
-    time_stretches = []
-
-    for i in range(n_segments):
-        start_idx = i * segment_size
-        end_idx = min((i + 1) * segment_size, len(path) - 1)
-
-        if start_idx >= len(path) or end_idx >= len(path):
-            break
-
-        # Get frame indices at segment boundaries
-        user_start, ref_start = path[start_idx]
-        user_end, ref_end = path[end_idx]
-
-        # Calculate actual time spans
-        user_time = (user_end - user_start) * user_features.hop_length / user_features.sample_rate
-        ref_time = (ref_end - ref_start) * ref_features.hop_length / ref_features.sample_rate
-
-        # Avoid division by zero
-        if ref_time > 0:
-            stretch = user_time / ref_time
-        else:
-            stretch = 1.0
-
-        time_stretches.append(stretch)
-
-    return np.array(time_stretches) if time_stretches else np.array([1.0])
+    return path_time_stretch(
+        path_user, path_ref,
+        user_features.frame_duration,
+        ref_features.frame_duration,
+        n_segments
+    )
 
 
 def get_aligned_frames(
@@ -157,11 +203,10 @@ def get_aligned_frames(
     Due to DTW, a single user frame might map to multiple reference frames
     (if user is speaking faster) or vice versa.
     """
-    ref_frames = []
-    for u, r in alignment.path:
-        if u == user_frame:
-            ref_frames.append(r)
-    return ref_frames
+    # DTW paths are monotonic, so a user frame's entries form one sorted run
+    lo = np.searchsorted(alignment.path_user, user_frame, side='left')
+    hi = np.searchsorted(alignment.path_user, user_frame, side='right')
+    return alignment.path_ref[lo:hi].tolist()
 
 
 def segment_alignment(
@@ -173,20 +218,9 @@ def segment_alignment(
 
     Returns list of ((user_start, user_end), (ref_start, ref_end)) tuples.
     """
-    path = alignment.path
-    segment_size = len(path) // n_segments
-
-    segments = []
-    for i in range(n_segments):
-        start_idx = i * segment_size
-        end_idx = min((i + 1) * segment_size - 1, len(path) - 1)
-
-        user_start, ref_start = path[start_idx]
-        user_end, ref_end = path[end_idx]
-
-        segments.append((
-            (user_start, user_end),
-            (ref_start, ref_end)
-        ))
+    bounds = path_segment_bounds(alignment.path_user, alignment.path_ref, n_segments).tolist()
 
-    return segments
+    return [
+        ((user_start, user_end), (ref_start, ref_end))
+        for user_start, user_end, ref_start, ref_end in bounds
+    ]
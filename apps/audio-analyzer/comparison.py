@@ -10,10 +10,15 @@ Compares user recitation features against reference to detect:
 from dataclasses import dataclass, field
 
 import numpy as np
-from scipy.spatial.distance import cosine
 
-from features import AudioFeatures
+from features import AudioFeatures, prefix_sum
 from alignment import AlignmentResult, segment_alignment
+from _comparison_numba import (
+    makhraj_score as _makhraj_score,
+    score_segments,
+    timing_score as _timing_score,
+    voiced_pitch_stats,
+)
 
 
 @dataclass
@@ -27,6 +32,19 @@ class SegmentFeedback:
     issues: list[str] = field(default_factory=list)
 
 
+@dataclass
+class SegmentStats:
+    """Feature statistics over one segment, shared by the issue detectors"""
+    mfcc_low: float   # Mean of MFCCs 1-4 (vocal tract shape)
+    mfcc_high: float  # Mean of MFCCs 5-8 (fine articulation), 0 if unavailable
+    centroid: float   # Mean spectral centroid
+    energy: float     # Mean RMS energy
+    n_voiced: int     # Number of voiced frames (pitch > 0)
+    pitch_mean: float  # Mean pitch over voiced frames, 0 if none
+    pitch_std: float   # Pitch standard deviation over voiced frames, 0 if none
+    max_pitch_jump: float  # Largest change between consecutive voiced frames, 0 if < 2
+
+
 @dataclass
 class PronunciationReport:
     """Complete pronunciation analysis report"""
@@ -59,33 +77,44 @@ def compare_recitations(
     # Get segment boundaries
     segments = segment_alignment(alignment, n_segments)
 
+    user_starts = np.array([u[0] for u, _ in segments])
+    user_ends = np.array([u[1] for u, _ in segments])
+    ref_starts = np.array([r[0] for _, r in segments])
+    ref_ends = np.array([r[1] for _, r in segments])
+
+    # Score makhraj (MFCC) and timing for all segments in parallel.
+    # Segment ends are inclusive.
+    segment_makhraj_scores, segment_timing_scores = score_segment_ranges(
+        user_features, user_starts, user_ends + 1,
+        ref_features, ref_starts, ref_ends + 1,
+        (user_ends - user_starts) * user_features.frame_duration,
+        (ref_ends - ref_starts) * ref_features.frame_duration
+    )
+
+    # Band/centroid/energy/pitch statistics for issue detection
+    user_stats = compute_segment_stats(user_features, user_starts, user_ends + 1)
+    ref_stats = compute_segment_stats(ref_features, ref_starts, ref_ends + 1)
+
     segment_feedbacks = []
     makhraj_scores = []
     timing_scores = []
 
-    for (user_start, user_end), (ref_start, ref_end) in segments:
+    for i, ((user_start, user_end), (ref_start, ref_end)) in enumerate(segments):
         # Calculate segment times
-        start_time = user_start * user_features.hop_length / user_features.sample_rate
-        end_time = user_end * user_features.hop_length / user_features.sample_rate
+        start_time = user_start * user_features.frame_duration
+        end_time = user_end * user_features.frame_duration
 
-        # Compare MFCC (spectral/makhraj)
-        makhraj_score = compare_mfcc_segment(
-            user_features.mfcc[:, user_start:user_end+1],
-            ref_features.mfcc[:, ref_start:ref_end+1]
-        )
+        makhraj_score = float(segment_makhraj_scores[i])
 
-        # Compare timing
-        timing_score = compare_timing_segment(
-            user_start, user_end, user_features,
-            ref_start, ref_end, ref_features
-        )
+        timing_score = float(segment_timing_scores[i])
 
         # Detect specific issues
         issues = detect_issues(
             user_features, ref_features,
             user_start, user_end,
             ref_start, ref_end,
-            makhraj_score, timing_score
+            makhraj_score, timing_score,
+            user_stats[i], ref_stats[i]
         )
 
         # Overall segment score
@@ -133,8 +162,8 @@ def compare_recitations(
 
 
 def compare_mfcc_segment(
-    user_mfcc: np.ndarray,
-    ref_mfcc: np.ndarray
+    user_start: int, user_end: int, user_features: AudioFeatures,
+    ref_start: int, ref_end: int, ref_features: AudioFeatures
 ) -> float:
     """
     Compare MFCC features between user and reference segment.
@@ -142,30 +171,160 @@ def compare_mfcc_segment(
     MFCC captures the spectral envelope which reflects articulation.
     Different makhraj (articulation points) produce different spectral shapes.
 
+    Frame ranges are half-open ([start, end)); means and variances come
+    from the cached MFCC prefix sums instead of slicing the matrices.
+
     Returns score 0-100 (higher = more similar = better)
     """
-    if user_mfcc.size == 0 or ref_mfcc.size == 0:
-        return 50.0  # Neutral score for empty segments
+    return _makhraj_score(
+        user_features.mfcc_cumsum, user_features.mfcc_sq_cumsum, user_start, user_end,
+        ref_features.mfcc_cumsum, ref_features.mfcc_sq_cumsum, ref_start, ref_end
+    )
 
-    # Average MFCC across time for this segment
-    user_mean = np.mean(user_mfcc, axis=1)
-    ref_mean = np.mean(ref_mfcc, axis=1)
 
-    # Cosine similarity (1 = identical, 0 = orthogonal, -1 = opposite)
-    similarity = 1 - cosine(user_mean, ref_mean)
+def score_segment_ranges(
+    user_features: AudioFeatures,
+    user_starts: np.ndarray,
+    user_ends: np.ndarray,
+    ref_features: AudioFeatures,
+    ref_starts: np.ndarray,
+    ref_ends: np.ndarray,
+    user_durations: np.ndarray,
+    ref_durations: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Makhraj and timing scores for many segments at once.
 
-    # Also compare MFCC variance (consistency)
-    user_var = np.var(user_mfcc, axis=1)
-    ref_var = np.var(ref_mfcc, axis=1)
-    var_similarity = 1 - cosine(user_var + 1e-6, ref_var + 1e-6)
+    Frame ranges are half-open ([start, end)) and used for the MFCC
+    comparison; durations (seconds) are used for the timing comparison.
 
-    # Combine similarities
-    combined = 0.7 * similarity + 0.3 * var_similarity
+    Returns:
+        Tuple of (makhraj_scores, timing_scores), each 0-100 per segment
+    """
+    n_segments = len(user_starts)
+    makhraj_scores = np.empty(n_segments)
+    timing_scores = np.empty(n_segments)
+
+    score_segments(
+        user_features.mfcc_cumsum, user_features.mfcc_sq_cumsum,
+        ref_features.mfcc_cumsum, ref_features.mfcc_sq_cumsum,
+        user_starts, user_ends, ref_starts, ref_ends,
+        np.asarray(user_durations, dtype=np.float64),
+        np.asarray(ref_durations, dtype=np.float64),
+        makhraj_scores, timing_scores
+    )
+
+    return makhraj_scores, timing_scores
 
-    # Convert to 0-100 scale
-    # Similarity typically ranges from 0.5 to 1.0 for reasonable recitations
-    score = max(0, (combined - 0.3) / 0.7) * 100
-    return min(100, score)
+
+def range_means(
+    csum: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> np.ndarray:
+    """
+    Mean over [start, end) for many segments from a prefix sum (see prefix_sum).
+
+    Prefix sums are used rather than np.add.reduceat since segment ranges
+    may overlap (neighbouring segments can share a boundary frame).
+
+    Returns:
+        Array of shape (n_segments,) or (n_segments, n_features)
+    """
+    lengths = ends - starts
+    if csum.ndim > 1:
+        lengths = lengths[:, None]
+    return (csum[ends] - csum[starts]) / lengths
+
+
+def segment_means(
+    x: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> np.ndarray:
+    """
+    Mean of x[start:end] for many segments in one pass.
+
+    Args:
+        x: Feature array, shape (n_frames,) or (n_frames, n_features)
+        starts: First frame of each segment
+        ends: One past the last frame of each segment
+    """
+    return range_means(prefix_sum(x), starts, ends)
+
+
+def segment_stat_arrays(
+    features: AudioFeatures,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    Feature statistics for many segments at once, as one array per
+    SegmentStats field (keyed by field name).
+
+    Args:
+        features: Audio features the segments index into
+        starts: First frame of each segment
+        ends: One past the last frame of each segment
+    """
+    mfcc_means = range_means(features.mfcc_cumsum, starts, ends)
+
+    # Every segment spans all coefficients for the same frames, so the band
+    # mean over (coefficients x frames) is the mean of per-coefficient means
+    low = mfcc_means[:, 1:5].mean(axis=1)
+    if mfcc_means.shape[1] > 8:
+        high = mfcc_means[:, 5:9].mean(axis=1)
+    else:
+        high = np.zeros(len(starts))
+
+    centroid = segment_means(features.spectral_centroid, starts, ends)
+    energy = segment_means(features.rms_energy, starts, ends)
+
+    # Voiced-pitch statistics from the cached voiced prefix sums
+    n_segments = len(starts)
+    n_voiced = np.empty(n_segments, dtype=np.int64)
+    pitch_mean = np.empty(n_segments)
+    pitch_std = np.empty(n_segments)
+    max_pitch_jump = np.empty(n_segments)
+    voiced_pitch_stats(
+        features.pitch,
+        features.voiced_count_cumsum,
+        features.voiced_pitch_cumsum,
+        features.voiced_pitch_sq_cumsum,
+        starts, ends,
+        n_voiced, pitch_mean, pitch_std, max_pitch_jump
+    )
+
+    return {
+        'mfcc_low': low,
+        'mfcc_high': high,
+        'centroid': centroid,
+        'energy': energy,
+        'n_voiced': n_voiced,
+        'pitch_mean': pitch_mean,
+        'pitch_std': pitch_std,
+        'max_pitch_jump': max_pitch_jump,
+    }
+
+
+def compute_segment_stats(
+    features: AudioFeatures,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> list[SegmentStats]:
+    """
+    Feature statistics for many segments at once, one SegmentStats each.
+
+    Args:
+        features: Audio features the segments index into
+        starts: First frame of each segment
+        ends: One past the last frame of each segment
+    """
+    arrays = segment_stat_arrays(features, starts, ends)
+    return [
+        SegmentStats(**dict(zip(arrays, stats)))
+        for stats in zip(*(values.tolist() for values in arrays.values()))
+    ]
 
 
 def compare_timing_segment(
@@ -181,33 +340,10 @@ def compare_timing_segment(
     Returns score 0-100 (higher = better timing match)
     """
     # Calculate durations in seconds
-    user_duration = (user_end - user_start) * user_features.hop_length / user_features.sample_rate
-    ref_duration = (ref_end - ref_start) * ref_features.hop_length / ref_features.sample_rate
-
-    if ref_duration == 0:
-        return 50.0
-
-    # Ratio of durations (1.0 = perfect match)
-    ratio = user_duration / ref_duration
-
-    # Score based on how close ratio is to 1.0
-    # Allow some tolerance (0.8 to 1.2 is acceptable)
-    if 0.8 <= ratio <= 1.2:
-        # Good range - score 80-100
-        deviation = abs(ratio - 1.0)
-        score = 100 - (deviation / 0.2) * 20
-    elif 0.5 <= ratio <= 1.5:
-        # Acceptable range - score 50-80
-        if ratio < 1:
-            deviation = (0.8 - ratio) / 0.3
-        else:
-            deviation = (ratio - 1.2) / 0.3
-        score = 80 - deviation * 30
-    else:
-        # Too fast or too slow - score 0-50
-        score = max(0, 50 - abs(ratio - 1.0) * 25)
+    user_duration = (user_end - user_start) * user_features.frame_duration
+    ref_duration = (ref_end - ref_start) * ref_features.frame_duration
 
-    return min(100, max(0, score))
+    return _timing_score(user_duration, ref_duration)
 
 
 def detect_issues(
@@ -216,18 +352,23 @@ def detect_issues(
     user_start: int, user_end: int,
     ref_start: int, ref_end: int,
     makhraj_score: float,
-    timing_score: float
+    timing_score: float,
+    user_stats: SegmentStats,
+    ref_stats: SegmentStats
 ) -> list[str]:
     """
     Detect specific pronunciation issues in a segment.
 
+    Spectral, pitch and energy checks use the precomputed segment
+    statistics in user_stats/ref_stats (see compute_segment_stats).
+
     Returns list of issue descriptions.
     """
     issues = []
 
     # Timing issues
-    user_duration = (user_end - user_start) * user_features.hop_length / user_features.sample_rate
-    ref_duration = (ref_end - ref_start) * ref_features.hop_length / ref_features.sample_rate
+    user_duration = (user_end - user_start) * user_features.frame_duration
+    ref_duration = (ref_end - ref_start) * ref_features.frame_duration
 
     if ref_duration > 0:
         ratio = user_duration / ref_duration
@@ -237,24 +378,18 @@ def detect_issues(
             issues.append("Reciting too slow - elongation may be excessive")
 
     # Makhraj issues - analyze MFCC differences
-    user_mfcc = user_features.mfcc[:, user_start:user_end+1]
-    ref_mfcc = ref_features.mfcc[:, ref_start:ref_end+1]
-
-    if user_mfcc.size > 0 and ref_mfcc.size > 0:
+    if user_end >= user_start and ref_end >= ref_start:
         # Lower MFCCs (1-4) relate to vocal tract shape (throat, tongue position)
-        user_low = np.mean(user_mfcc[1:5, :])
-        ref_low = np.mean(ref_mfcc[1:5, :])
+        user_low = user_stats.mfcc_low
+        ref_low = ref_stats.mfcc_low
         low_diff = abs(user_low - ref_low)
 
         # Higher MFCCs (5-8) relate to finer articulation details
-        user_high = np.mean(user_mfcc[5:9, :]) if user_mfcc.shape[0] > 8 else 0
-        ref_high = np.mean(ref_mfcc[5:9, :]) if ref_mfcc.shape[0] > 8 else 0
-        high_diff = abs(user_high - ref_high)
+        high_diff = abs(user_stats.mfcc_high - ref_stats.mfcc_high)
 
         # Spectral centroid difference (brightness/sharpness)
-        user_centroid = np.mean(user_features.spectral_centroid[user_start:user_end+1])
-        ref_centroid = np.mean(ref_features.spectral_centroid[ref_start:ref_end+1])
-        centroid_ratio = user_centroid / ref_centroid if ref_centroid > 0 else 1.0
+        ref_centroid = ref_stats.centroid
+        centroid_ratio = user_stats.centroid / ref_centroid if ref_centroid > 0 else 1.0
 
         # Detect various makhraj issues with more sensitive thresholds
         if makhraj_score < 80:
@@ -281,19 +416,13 @@ def detect_issues(
 
     # Pitch issues - detect wrong intonation
     if user_end > user_start and ref_end > ref_start:
-        user_pitch = user_features.pitch[user_start:user_end+1]
-        ref_pitch = ref_features.pitch[ref_start:ref_end+1]
-
-        # Filter out unvoiced regions (pitch = 0)
-        user_voiced = user_pitch[user_pitch > 0]
-        ref_voiced = ref_pitch[ref_pitch > 0]
-
-        if len(user_voiced) > 0 and len(ref_voiced) > 0:
-            user_mean_pitch = np.mean(user_voiced)
-            ref_mean_pitch = np.mean(ref_voiced)
+        # Statistics only cover voiced regions (pitch > 0)
+        if user_stats.n_voiced > 0 and ref_stats.n_voiced > 0:
+            user_mean_pitch = user_stats.pitch_mean
+            ref_mean_pitch = ref_stats.pitch_mean
 
-            user_pitch_std = np.std(user_voiced)
-            ref_pitch_std = np.std(ref_voiced)
+            user_pitch_std = user_stats.pitch_std
+            ref_pitch_std = ref_stats.pitch_std
 
             # Check if pitch is significantly higher or lower
             pitch_ratio = user_mean_pitch / ref_mean_pitch if ref_mean_pitch > 0 else 1.0
@@ -308,18 +437,17 @@ def detect_issues(
                 issues.append("Pitch variation detected - maintain steadier tone")
 
             # Check for sudden pitch jumps (like the high 'ha' the user mentioned)
-            if len(user_voiced) > 3:
-                pitch_diffs = np.abs(np.diff(user_voiced))
-                max_jump = np.max(pitch_diffs)
-                ref_max_jump = np.max(np.abs(np.diff(ref_voiced))) if len(ref_voiced) > 3 else 50
+            if user_stats.n_voiced > 3:
+                max_jump = user_stats.max_pitch_jump
+                ref_max_jump = ref_stats.max_pitch_jump if ref_stats.n_voiced > 3 else 50
 
                 if max_jump > ref_max_jump * 1.5 and max_jump > 30:
                     issues.append("Sudden pitch change detected - keep tone consistent")
 
     # Energy issues (for emphasis letters, qalqalah)
     if user_end > user_start and ref_end > ref_start:
-        user_energy = np.mean(user_features.rms_energy[user_start:user_end+1])
-        ref_energy = np.mean(ref_features.rms_energy[ref_start:ref_end+1])
+        user_energy = user_stats.energy
+        ref_energy = ref_stats.energy
 
         if ref_energy > 0:
             energy_ratio = user_energy / ref_energy
@@ -352,8 +480,12 @@ def compare_word_by_word(
     """
     results = []
 
-    # Calculate frame duration in seconds
-    frame_duration = ref_features.hop_length / ref_features.sample_rate
+    # Words to score: (index into results, user_start, user_end, ref_start, ref_end)
+    scored_words = []
+
+    # Frame durations in seconds
+    frame_duration = ref_features.frame_duration
+    user_frame_duration = user_features.frame_duration
 
     for word in word_timings:
         word_index = word['word_index']
@@ -383,14 +515,13 @@ def compare_word_by_word(
         ref_start_frame = max(0, min(ref_start_frame, ref_features.n_frames - 1))
         ref_end_frame = max(ref_start_frame + 1, min(ref_end_frame, ref_features.n_frames))
 
-        # Find corresponding user frames using DTW alignment path
-        # alignment.path is [(user_idx, ref_idx), ...]
-        user_frames_for_word = []
-        for user_idx, ref_idx in alignment.path:
-            if ref_start_frame <= ref_idx < ref_end_frame:
-                user_frames_for_word.append(user_idx)
+        # Find corresponding user frames using DTW alignment path.
+        # The path is monotonic in both sequences, so the word's cells
+        # form one contiguous run found by binary search.
+        path_lo = int(np.searchsorted(alignment.path_ref, ref_start_frame, side='left'))
+        path_hi = int(np.searchsorted(alignment.path_ref, ref_end_frame, side='left'))
 
-        if not user_frames_for_word:
+        if path_hi <= path_lo:
             # No alignment found for this word
             results.append({
                 'word_index': word_index,
@@ -404,43 +535,52 @@ def compare_word_by_word(
             })
             continue
 
-        user_start_frame = min(user_frames_for_word)
-        user_end_frame = max(user_frames_for_word) + 1
+        user_start_frame = int(alignment.path_user[path_lo])
+        user_end_frame = int(alignment.path_user[path_hi - 1]) + 1
 
-        # Calculate time in user's audio
-        user_frame_duration = user_features.hop_length / user_features.sample_rate
-        user_start_time = user_start_frame * user_frame_duration
-        user_end_time = user_end_frame * user_frame_duration
+        # Scores are filled in below, once all word ranges are known
+        scored_words.append((
+            len(results),
+            user_start_frame, user_end_frame,
+            ref_start_frame, ref_end_frame
+        ))
+        results.append({
+            'word_index': word_index,
+            'text': text,
+            'start_time': user_start_frame * user_frame_duration,
+            'end_time': user_end_frame * user_frame_duration,
+        })
 
-        # Compare MFCC for this word (makhraj)
-        makhraj_score = compare_mfcc_segment(
-            user_features.mfcc[:, user_start_frame:user_end_frame],
-            ref_features.mfcc[:, ref_start_frame:ref_end_frame]
-        )
+    if not scored_words:
+        return results
 
-        # Compare timing
-        timing_score = compare_timing_segment(
-            user_start_frame, user_end_frame, user_features,
-            ref_start_frame, ref_end_frame, ref_features
-        )
+    result_indices, user_starts, user_ends, ref_starts, ref_ends = (
+        np.array(column) for column in zip(*scored_words)
+    )
+    user_durations = (user_ends - user_starts) * user_features.frame_duration
+    ref_durations = (ref_ends - ref_starts) * ref_features.frame_duration
+
+    # Compare MFCC (makhraj) and timing for all words in one batch
+    makhraj_scores, timing_scores = score_segment_ranges(
+        user_features, user_starts, user_ends,
+        ref_features, ref_starts, ref_ends,
+        user_durations, ref_durations
+    )
 
-        # Detect issues for this word
-        issues = detect_word_issues(
-            user_features, ref_features,
-            user_start_frame, user_end_frame,
-            ref_start_frame, ref_end_frame,
-            makhraj_score, timing_score,
-            text
-        )
+    # Detect issues for all words from their band/energy/pitch statistics
+    word_issues = detect_word_issues(
+        makhraj_scores, user_durations, ref_durations,
+        segment_stat_arrays(user_features, user_starts, user_ends),
+        segment_stat_arrays(ref_features, ref_starts, ref_ends)
+    )
 
+    for i, makhraj_score, timing_score, issues in zip(
+        result_indices.tolist(), makhraj_scores.tolist(), timing_scores.tolist(), word_issues
+    ):
         # Overall score for this word
         overall = 0.6 * makhraj_score + 0.4 * timing_score
 
-        results.append({
-            'word_index': word_index,
-            'text': text,
-            'start_time': user_start_time,
-            'end_time': user_end_time,
+        results[i].update({
             'makhraj_score': makhraj_score,
             'timing_score': timing_score,
             'overall_score': overall,
@@ -451,101 +591,89 @@ def compare_word_by_word(
 
 
 def detect_word_issues(
-    user_features: AudioFeatures,
-    ref_features: AudioFeatures,
-    user_start: int, user_end: int,
-    ref_start: int, ref_end: int,
-    makhraj_score: float,
-    timing_score: float,
-    word_text: str
-) -> list[str]:
+    makhraj_scores: np.ndarray,
+    user_durations: np.ndarray,
+    ref_durations: np.ndarray,
+    user_stats: dict[str, np.ndarray],
+    ref_stats: dict[str, np.ndarray]
+) -> list[list[str]]:
     """
-    Detect specific pronunciation issues for a single word.
+    Detect specific pronunciation issues for many words at once.
 
-    Similar to detect_issues but tailored for word-level feedback.
-    """
-    issues = []
-
-    # Skip if frame range is too small
-    if user_end <= user_start or ref_end <= ref_start:
-        return issues
-
-    # Timing issues
-    user_duration = (user_end - user_start) * user_features.hop_length / user_features.sample_rate
-    ref_duration = (ref_end - ref_start) * ref_features.hop_length / ref_features.sample_rate
-
-    if ref_duration > 0:
-        ratio = user_duration / ref_duration
-        if ratio < 0.6:
-            issues.append("Too fast - extend this word")
-        elif ratio > 1.6:
-            issues.append("Too slow - shorten this word")
-
-    # Makhraj issues based on MFCC differences
-    if makhraj_score < 75:
-        user_mfcc = user_features.mfcc[:, user_start:user_end]
-        ref_mfcc = ref_features.mfcc[:, ref_start:ref_end]
-
-        if user_mfcc.size > 0 and ref_mfcc.size > 0:
-            # Low MFCCs = vocal tract shape (throat/tongue)
-            user_low = np.mean(user_mfcc[1:5, :])
-            ref_low = np.mean(ref_mfcc[1:5, :])
-            low_diff = abs(user_low - ref_low)
-
-            # High MFCCs = fine articulation
-            user_high = np.mean(user_mfcc[5:9, :]) if user_mfcc.shape[0] > 8 else 0
-            ref_high = np.mean(ref_mfcc[5:9, :]) if ref_mfcc.shape[0] > 8 else 0
-            high_diff = abs(user_high - ref_high)
-
-            if low_diff > 6:
-                if user_low < ref_low:
-                    issues.append("Articulation point too shallow")
-                else:
-                    issues.append("Articulation point too deep")
-
-            if high_diff > 4 and makhraj_score < 65:
-                issues.append("Letter clarity needs work")
-
-    # Pitch issues
-    if user_end > user_start and ref_end > ref_start:
-        user_pitch = user_features.pitch[user_start:user_end]
-        ref_pitch = ref_features.pitch[ref_start:ref_end]
-
-        user_voiced = user_pitch[user_pitch > 0]
-        ref_voiced = ref_pitch[ref_pitch > 0]
+    Similar to detect_issues but tailored for word-level feedback. Every
+    check is evaluated as an array expression over all words; only the
+    issue lists are assembled per word.
 
-        if len(user_voiced) > 0 and len(ref_voiced) > 0:
-            user_mean_pitch = np.mean(user_voiced)
-            ref_mean_pitch = np.mean(ref_voiced)
-            pitch_ratio = user_mean_pitch / ref_mean_pitch if ref_mean_pitch > 0 else 1.0
-
-            if pitch_ratio > 1.4:
-                issues.append("Pitch too high")
-            elif pitch_ratio < 0.65:
-                issues.append("Pitch too low")
-
-            # Detect sudden pitch jumps within the word
-            if len(user_voiced) > 3:
-                pitch_diffs = np.abs(np.diff(user_voiced))
-                max_jump = np.max(pitch_diffs)
-                ref_max_jump = np.max(np.abs(np.diff(ref_voiced))) if len(ref_voiced) > 3 else 40
-
-                if max_jump > ref_max_jump * 1.4 and max_jump > 25:
-                    issues.append("Unstable pitch")
-
-    # Energy issues
-    if user_end > user_start and ref_end > ref_start:
-        user_energy = np.mean(user_features.rms_energy[user_start:user_end])
-        ref_energy = np.mean(ref_features.rms_energy[ref_start:ref_end])
-
-        if ref_energy > 0:
-            energy_ratio = user_energy / ref_energy
-            if energy_ratio < 0.4:
-                issues.append("Too quiet")
-            elif energy_ratio > 2.5:
-                issues.append("Too loud")
+    Args:
+        makhraj_scores: Makhraj score per word
+        user_durations: Duration of each word in the user's audio (seconds)
+        ref_durations: Duration of each word in the reference audio (seconds)
+        user_stats: Per-word statistics of the user's audio (see segment_stat_arrays)
+        ref_stats: Per-word statistics of the reference audio
 
-    return issues
+    Returns:
+        List of issue descriptions per word
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Timing issues
+        has_ref_duration = ref_durations > 0
+        ratio = user_durations / np.where(has_ref_duration, ref_durations, 1.0)
+        too_fast = has_ref_duration & (ratio < 0.6)
+        too_slow = has_ref_duration & (ratio > 1.6)
+
+        # Makhraj issues based on MFCC differences
+        check_makhraj = makhraj_scores < 75
+
+        # Low MFCCs = vocal tract shape (throat/tongue)
+        user_low = user_stats['mfcc_low']
+        ref_low = ref_stats['mfcc_low']
+        articulation = check_makhraj & (np.abs(user_low - ref_low) > 6)
+        too_shallow = user_low < ref_low
+
+        # High MFCCs = fine articulation
+        high_diff = np.abs(user_stats['mfcc_high'] - ref_stats['mfcc_high'])
+        unclear = check_makhraj & (high_diff > 4) & (makhraj_scores < 65)
+
+        # Pitch issues (statistics only cover voiced frames)
+        user_voiced = user_stats['n_voiced']
+        ref_voiced = ref_stats['n_voiced']
+        both_voiced = (user_voiced > 0) & (ref_voiced > 0)
+
+        ref_mean_pitch = ref_stats['pitch_mean']
+        pitch_ratio = np.where(ref_mean_pitch > 0, user_stats['pitch_mean'] / ref_mean_pitch, 1.0)
+        pitch_high = both_voiced & (pitch_ratio > 1.4)
+        pitch_low = both_voiced & (pitch_ratio < 0.65)
+
+        # Detect sudden pitch jumps within the word
+        max_jump = user_stats['max_pitch_jump']
+        ref_max_jump = np.where(ref_voiced > 3, ref_stats['max_pitch_jump'], 40)
+        unstable = both_voiced & (user_voiced > 3) & (max_jump > ref_max_jump * 1.4) & (max_jump > 25)
+
+        # Energy issues
+        ref_energy = ref_stats['energy']
+        energy_ratio = user_stats['energy'] / ref_energy
+        too_quiet = (ref_energy > 0) & (energy_ratio < 0.4)
+        too_loud = (ref_energy > 0) & (energy_ratio > 2.5)
+
+    checks = [
+        (too_fast, "Too fast - extend this word"),
+        (too_slow, "Too slow - shorten this word"),
+        (articulation & too_shallow, "Articulation point too shallow"),
+        (articulation & ~too_shallow, "Articulation point too deep"),
+        (unclear, "Letter clarity needs work"),
+        (pitch_high, "Pitch too high"),
+        (pitch_low, "Pitch too low"),
+        (unstable, "Unstable pitch"),
+        (too_quiet, "Too quiet"),
+        (too_loud, "Too loud"),
+    ]
+    messages = [message for _, message in checks]
+    flags = np.stack([flag for flag, _ in checks], axis=1).tolist()
+
+    return [
+        [message for message, flagged in zip(messages, word_flags) if flagged]
+        for word_flags in flags
+    ]
 
 
 def generate_summary(
@@ -6,14 +6,36 @@ These features are used to compare user recitation against reference audio.
 """
 
 import io
+import os
 import tempfile
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import cached_property
 from pathlib import Path
 
 import librosa
 import numpy as np
 import soundfile as sf
 
+try:
+    import soxr
+except ImportError:  # Optional: librosa.resample is used instead
+    soxr = None
+
+# Frames quieter than this fraction of the loudest frame are unvoiced
+VOICING_RMS_RATIO = 0.1
+
+# Version of the extract_features output. Cached reference features are
+# keyed by it, so bump it whenever extraction changes (frame parameters,
+# n_mfcc, the voicing gate, pitch bounds, resampling, ...)
+FEATURES_VERSION = 1
+
+# AudioFeatures fields kept by save_features: those alignment and
+# comparison read
+CACHED_FEATURE_FIELDS = (
+    "sample_rate", "duration", "mfcc", "spectral_centroid", "pitch",
+    "rms_energy", "hop_length", "n_frames", "frame_duration",
+)
+
 
 @dataclass
 class AudioFeatures:
@@ -30,7 +52,7 @@ class AudioFeatures:
 
     # Pitch features (for intonation)
     pitch: np.ndarray          # Fundamental frequency (F0)
-    pitch_confidence: np.ndarray  # Confidence of pitch detection
+    pitch_confidence: np.ndarray  # Voicing decision per frame (1 = voiced, 0 = unvoiced)
 
     # Energy features (for qalqalah, emphasis)
     rms_energy: np.ndarray     # Root mean square energy
@@ -40,20 +62,122 @@ class AudioFeatures:
     frame_times: np.ndarray    # Time of each frame in seconds
     hop_length: int
     n_frames: int
+    frame_duration: float      # Seconds per frame (hop_length / sample_rate)
+
+    @cached_property
+    def mfcc_t(self) -> np.ndarray:
+        """MFCC with frames as contiguous float32 rows (shape: frames x n_mfcc)"""
+        return np.ascontiguousarray(self.mfcc.T, dtype=np.float32)
+
+    @cached_property
+    def mfcc_cumsum(self) -> np.ndarray:
+        """Prefix sums of MFCC over frames (shape: frames+1 x n_mfcc)"""
+        return prefix_sum(self.mfcc_t)
+
+    @cached_property
+    def mfcc_sq_cumsum(self) -> np.ndarray:
+        """Prefix sums of squared MFCC over frames (shape: frames+1 x n_mfcc)"""
+        return prefix_sum(np.square(self.mfcc_t, dtype=np.float64))
+
+    @cached_property
+    def mfcc_mean(self) -> np.ndarray:
+        """Mean MFCC over the whole recording (shape: n_mfcc)"""
+        return np.mean(self.mfcc, axis=1)
+
+    @cached_property
+    def voiced_pitch(self) -> np.ndarray:
+        """Pitch with unvoiced frames (pitch <= 0) set to exactly 0"""
+        return np.where(self.pitch > 0, self.pitch, 0.0)
+
+    @cached_property
+    def voiced_count_cumsum(self) -> np.ndarray:
+        """Prefix counts of voiced frames (shape: frames+1)"""
+        return prefix_sum(self.pitch > 0)
+
+    @cached_property
+    def voiced_pitch_cumsum(self) -> np.ndarray:
+        """Prefix sums of voiced pitch over frames (shape: frames+1)"""
+        return prefix_sum(self.voiced_pitch)
+
+    @cached_property
+    def voiced_pitch_sq_cumsum(self) -> np.ndarray:
+        """Prefix sums of squared voiced pitch over frames (shape: frames+1)"""
+        return prefix_sum(np.square(self.voiced_pitch, dtype=np.float64))
+
+
+def prefix_sum(x: np.ndarray) -> np.ndarray:
+    """
+    Zero-prefixed cumulative sum over the first (frame) axis, in float64.
+
+    The sum of x[start:end] is then csum[end] - csum[start], so any segment
+    mean costs O(1) regardless of segment length. For 2-D inputs, frames
+    should be rows (e.g. AudioFeatures.mfcc_t) so that each lookup reads
+    one contiguous row.
+    """
+    csum = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, dtype=np.float64, out=csum[1:])
+    return csum
+
+
+def save_features(features: AudioFeatures, path: Path) -> None:
+    """
+    Save extracted features to a compressed .npz file (see load_features).
+
+    Only the fields alignment and comparison read are saved (see
+    CACHED_FEATURE_FIELDS); the raw waveform alone would be several times
+    the size of the recording it came from.
+
+    Written to a temporary file and renamed into place, so readers never
+    see a partial file; the temporary file is removed if the write fails.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".part", delete=False) as f:
+        try:
+            np.savez_compressed(f, **{
+                name: getattr(features, name) for name in CACHED_FEATURE_FIELDS
+            })
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+def load_features(path: Path) -> AudioFeatures:
+    """
+    Load features saved by save_features.
+
+    Fields that aren't cached (audio, mfcc_delta, pitch_confidence,
+    zero_crossing_rate, frame_times) are empty arrays.
+    """
+    with np.load(path) as data:
+        return AudioFeatures(**{
+            # Scalars come back as 0-d arrays
+            field.name: (
+                (data[field.name] if field.type is np.ndarray else field.type(data[field.name]))
+                if field.name in CACHED_FEATURE_FIELDS
+                else np.empty(0, dtype=np.float32)
+            )
+            for field in fields(AudioFeatures)
+        })
 
 
 def extract_features(
-    audio_data: bytes,
+    audio_data: bytes | Path,
     sample_rate: int = 22050,
     n_mfcc: int = 13,
     hop_length: int = 512,
     n_fft: int = 2048,
 ) -> AudioFeatures:
     """
-    Extract audio features from raw audio bytes.
+    Extract audio features from raw audio bytes or an audio file.
 
     Args:
-        audio_data: Raw audio bytes (supports wav, mp3, m4a, etc.)
+        audio_data: Raw audio bytes, or the path of an audio file
+                    (supports wav, mp3, m4a, etc.)
         sample_rate: Target sample rate for analysis
         n_mfcc: Number of MFCC coefficients to extract
         hop_length: Samples between frames
@@ -62,8 +186,11 @@ def extract_features(
     Returns:
         AudioFeatures object with all extracted features
     """
-    # Load audio from bytes
-    audio, sr = load_audio_from_bytes(audio_data, sample_rate)
+    # Load audio from disk or from bytes
+    if isinstance(audio_data, Path):
+        audio, sr = load_audio_from_path(audio_data, sample_rate)
+    else:
+        audio, sr = load_audio_from_bytes(audio_data, sample_rate)
 
     duration = len(audio) / sr
     n_frames = 1 + (len(audio) - n_fft) // hop_length
@@ -75,13 +202,14 @@ def extract_features(
         hop_length=hop_length
     )
 
+    # Magnitude spectrogram, computed once and shared by the spectral features
+    magnitude = np.abs(librosa.stft(audio, n_fft=n_fft, hop_length=hop_length))
+
     # Extract MFCC (captures spectral envelope - key for makhraj)
+    mel_power = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr)
     mfcc = librosa.feature.mfcc(
-        y=audio,
-        sr=sr,
-        n_mfcc=n_mfcc,
-        hop_length=hop_length,
-        n_fft=n_fft
+        S=librosa.power_to_db(mel_power),
+        n_mfcc=n_mfcc
     )
 
     # MFCC delta (captures transitions between sounds)
@@ -89,31 +217,39 @@ def extract_features(
 
     # Spectral centroid (brightness - helps distinguish letters)
     spectral_centroid = librosa.feature.spectral_centroid(
+        S=magnitude,
+        sr=sr
+    )[0]
+
+    # RMS energy (volume/intensity)
+    rms_energy = librosa.feature.rms(
         y=audio,
-        sr=sr,
         hop_length=hop_length,
-        n_fft=n_fft
+        frame_length=n_fft
     )[0]
 
-    # Pitch extraction using PYIN (probabilistic YIN)
-    pitch, voiced_flag, voiced_probs = librosa.pyin(
+    # Pitch extraction using YIN (autocorrelation only; pYIN's HMM
+    # decoding was the slowest step of feature extraction)
+    pitch_fmin = librosa.note_to_hz('C2')  # ~65 Hz (low male voice)
+    pitch_fmax = librosa.note_to_hz('C6')  # ~1047 Hz (high female/child voice)
+    pitch = librosa.yin(
         audio,
-        fmin=librosa.note_to_hz('C2'),  # ~65 Hz (low male voice)
-        fmax=librosa.note_to_hz('C6'),  # ~1047 Hz (high female/child voice)
+        fmin=pitch_fmin,
+        fmax=pitch_fmax,
         sr=sr,
+        frame_length=n_fft,
         hop_length=hop_length
     )
 
-    # Replace NaN with 0 for unvoiced regions
-    pitch = np.nan_to_num(pitch, nan=0.0)
-    pitch_confidence = voiced_probs
-
-    # RMS energy (volume/intensity)
-    rms_energy = librosa.feature.rms(
-        y=audio,
-        hop_length=hop_length,
-        frame_length=n_fft
-    )[0]
+    # YIN estimates a pitch for every frame; treat quiet frames and
+    # estimates pinned to the search bounds as unvoiced (pitch = 0)
+    voiced = (
+        (rms_energy > VOICING_RMS_RATIO * rms_energy.max())
+        & (pitch > pitch_fmin * 1.01)
+        & (pitch < pitch_fmax * 0.99)
+    )
+    pitch = np.where(voiced, pitch, 0.0)
+    pitch_confidence = voiced.astype(np.float32)
 
     # Zero crossing rate (helps distinguish consonants)
     zcr = librosa.feature.zero_crossing_rate(
@@ -122,6 +258,15 @@ def extract_features(
         frame_length=n_fft
     )[0]
 
+    # Store every feature as C-contiguous float32: the comparison code is
+    # dominated by reductions over these arrays, and MFCC rows stay
+    # contiguous along the frame axis
+    audio, mfcc, mfcc_delta, spectral_centroid, pitch, pitch_confidence, rms_energy, zcr = (
+        np.ascontiguousarray(x, dtype=np.float32)
+        for x in (audio, mfcc, mfcc_delta, spectral_centroid, pitch,
+                  pitch_confidence, rms_energy, zcr)
+    )
+
     return AudioFeatures(
         audio=audio,
         sample_rate=sr,
@@ -136,6 +281,7 @@ def extract_features(
         frame_times=frame_times,
         hop_length=hop_length,
         n_frames=n_frames,
+        frame_duration=hop_length / sr,
     )
 
 
@@ -185,6 +331,65 @@ def detect_audio_format(audio_bytes: bytes) -> str:
     return ".m4a"
 
 
+def resample_audio(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample mono audio, using the SIMD soxr kernel directly when available.
+
+    Falls back to librosa.resample (same soxr_hq quality, more overhead).
+    """
+    if orig_sr == target_sr:
+        return audio
+    if soxr is not None:
+        return soxr.resample(audio, orig_sr, target_sr, quality='HQ')
+    return librosa.resample(audio, orig_sr=orig_sr, target_sr=target_sr)
+
+
+def decode_audio_pyav(audio_bytes: bytes | Path) -> tuple[np.ndarray, int]:
+    """
+    Decode compressed audio in memory with PyAV (FFmpeg bindings).
+
+    Args:
+        audio_bytes: Raw audio bytes in any container/codec FFmpeg supports,
+                     or the path of such a file (read directly by FFmpeg)
+
+    Returns:
+        Tuple of (mono float32 audio array, native sample rate)
+    """
+    import av
+
+    chunks = []
+    sr = None
+
+    source = str(audio_bytes) if isinstance(audio_bytes, Path) else io.BytesIO(audio_bytes)
+
+    with av.open(source) as container:
+        stream = container.streams.audio[0]
+
+        # Convert to planar float32 (channels x samples), keeping the native
+        # layout and sample rate. The downmix is done below by averaging the
+        # channels, like the soundfile/librosa path, rather than with
+        # swresample's own mixing coefficients, so user and reference audio
+        # share a level scale.
+        resampler = av.AudioResampler(format='fltp')
+
+        for frame in container.decode(stream):
+            sr = frame.sample_rate
+            for planar_frame in resampler.resample(frame):
+                chunks.append(planar_frame.to_ndarray())
+
+        # Flush samples still buffered in the resampler
+        for planar_frame in resampler.resample(None):
+            chunks.append(planar_frame.to_ndarray())
+
+    if not chunks:
+        raise ValueError("No audio frames decoded")
+
+    audio = np.concatenate(chunks, axis=1)
+
+    # Convert to mono if multi-channel
+    return audio.mean(axis=0) if audio.shape[0] > 1 else audio[0], sr
+
+
 def load_audio_from_bytes(audio_bytes: bytes, target_sr: int = 22050) -> tuple[np.ndarray, int]:
     """
     Load audio from bytes, handling various formats including iOS m4a and Android formats.
@@ -196,9 +401,8 @@ def load_audio_from_bytes(audio_bytes: bytes, target_sr: int = 22050) -> tuple[n
     Returns:
         Tuple of (audio array, sample rate)
     """
-    from pydub import AudioSegment
-
-    # Try to load directly with soundfile first (works for wav, flac)
+    # Try to load directly with soundfile first (works for wav, flac, ogg,
+    # and mp3 with libsndfile >= 1.1)
     try:
         audio_io = io.BytesIO(audio_bytes)
         audio, sr = sf.read(audio_io)
@@ -208,15 +412,25 @@ def load_audio_from_bytes(audio_bytes: bytes, target_sr: int = 22050) -> tuple[n
             audio = np.mean(audio, axis=1)
 
         # Resample if needed
-        if sr != target_sr:
-            audio = librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
-            sr = target_sr
+        audio = resample_audio(audio, sr, target_sr)
+        return audio.astype(np.float32), target_sr
+    except Exception:
+        pass
+
+    # Decode in-process with PyAV (m4a, webm, 3gp, etc.), which avoids the
+    # temp files and the ffmpeg subprocess of the pydub route below
+    try:
+        audio, sr = decode_audio_pyav(audio_bytes)
 
-        return audio.astype(np.float32), sr
+        # Resample if needed
+        audio = resample_audio(audio, sr, target_sr)
+        return audio.astype(np.float32), target_sr
     except Exception:
         pass
 
-    # Use pydub to handle various formats (m4a, 3gp, amr, webm, etc.)
+    # Last resort: use pydub to handle exotic codecs
+    from pydub import AudioSegment
+
     temp_input = None
     temp_wav = None
 
@@ -239,8 +453,8 @@ def load_audio_from_bytes(audio_bytes: bytes, target_sr: int = 22050) -> tuple[n
         audio_segment.export(temp_wav, format="wav")
 
         # Load the WAV file with librosa
-        audio, sr = librosa.load(temp_wav, sr=target_sr, mono=True)
-        return audio, sr
+        audio, sr = librosa.load(temp_wav, sr=None, mono=True)
+        return resample_audio(audio, sr, target_sr), target_sr
 
     except Exception as e:
         print(f"Audio loading error: {e}")
@@ -254,13 +468,55 @@ def load_audio_from_bytes(audio_bytes: bytes, target_sr: int = 22050) -> tuple[n
             Path(temp_wav).unlink(missing_ok=True)
 
 
+def load_audio_from_path(path: Path, target_sr: int = 22050) -> tuple[np.ndarray, int]:
+    """
+    Load audio straight from a file, e.g. a cached reference recording.
+
+    The decoders read the file themselves, so no copy of the encoded audio
+    is made in Python. Falls back to load_audio_from_bytes for formats only
+    pydub can handle.
+
+    Args:
+        path: Path of the audio file
+        target_sr: Target sample rate
+
+    Returns:
+        Tuple of (audio array, sample rate)
+    """
+    try:
+        audio, sr = sf.read(path)
+
+        # Convert to mono if stereo
+        if len(audio.shape) > 1:
+            audio = np.mean(audio, axis=1)
+
+        # Resample if needed
+        audio = resample_audio(audio, sr, target_sr)
+        return audio.astype(np.float32), target_sr
+    except Exception:
+        pass
+
+    try:
+        audio, sr = decode_audio_pyav(path)
+
+        # Resample if needed
+        audio = resample_audio(audio, sr, target_sr)
+        return audio.astype(np.float32), target_sr
+    except Exception:
+        pass
+
+    return load_audio_from_bytes(path.read_bytes(), target_sr)
+
+
 def compute_feature_distance(features1: AudioFeatures, features2: AudioFeatures) -> float:
     """
     Compute overall distance between two feature sets.
     Used for quick similarity check before detailed analysis.
     """
-    # Use mean MFCC as a compact representation
-    mfcc1_mean = np.mean(features1.mfcc, axis=1)
-    mfcc2_mean = np.mean(features2.mfcc, axis=1)
+    # Use mean MFCC as a compact representation (cached per recording)
+    mfcc1_mean = features1.mfcc_mean
+    mfcc2_mean = features2.mfcc_mean
 
-    return float(np.linalg.norm(mfcc1_mean - mfcc2_mean))
+    # Euclidean distance as a single dot product of the difference
+    diff = mfcc1_mean - mfcc2_mean
+    return float(np.sqrt(diff @ diff))
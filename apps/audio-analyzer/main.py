@@ -5,28 +5,111 @@ Compares user recitation audio against reference Qari recordings
 to detect pronunciation (makhraj) and timing (madd) issues.
 """
 
+import asyncio
 import base64
+import binascii
 import io
+import logging
+import os
 import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-from fastapi import FastAPI, HTTPException
+import orjson
+import soundfile as sf
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from features import extract_features, AudioFeatures
 from alignment import align_audio_features
 from comparison import compare_recitations, compare_word_by_word, PronunciationReport
-from reference_audio import get_reference_with_timings
+from reference_audio import (
+    close_http_client,
+    get_reference_with_timings,
+    is_reference_available,
+    load_verse_timestamps,
+)
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+log = logging.getLogger(__name__)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response serialized with orjson (handles NumPy values too)"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def warm_up_analysis() -> None:
+    """
+    Run a tiny analysis on a synthetic tone, so the numba kernels are
+    compiled (or loaded from the on-disk cache) before the first request
+    instead of during it.
+    """
+    sr = 22050
+    t = np.arange(sr) / sr
+    buffer = io.BytesIO()
+    sf.write(buffer, 0.5 * np.sin(2 * np.pi * 220 * t), sr, format='WAV')
+
+    features = extract_features(buffer.getvalue())
+    alignment = align_audio_features(features, features)
+    compare_recitations(features, features, alignment)
+    compare_word_by_word(
+        user_features=features,
+        ref_features=features,
+        alignment=alignment,
+        word_timings=[{"word_index": 0, "text": "", "start_ms": 0, "end_ms": 500}]
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown"""
+    # Download/parse the word timestamps once, before the first request,
+    # while the analysis kernels are compiled in a worker thread
+    await asyncio.gather(
+        load_verse_timestamps(),
+        asyncio.to_thread(warm_up_analysis),
+    )
+    yield
+    # Close the HTTP client shared by all reference fetches
+    await close_http_client()
+
 
 app = FastAPI(
     title="Quran Audio Analyzer",
     description="Analyzes Quran recitation pronunciation quality",
     version="0.1.0",
+    lifespan=lifespan,
+    # Serialize responses with orjson (per-word feedback can be large)
+    default_response_class=OrjsonResponse,
 )
 
+# Upload size limits, so a single oversized recording can't exhaust memory.
+# 25 MB of base64 decodes to ~18.75 MB of audio; request bodies may carry a
+# little extra for the other fields and the JSON/multipart framing.
+MAX_AUDIO_BASE64 = 25 * 1024 * 1024
+MAX_AUDIO_BYTES = MAX_AUDIO_BASE64 // 4 * 3
+MAX_REQUEST_BYTES = MAX_AUDIO_BASE64 + 64 * 1024
+
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    """Reject requests whose declared body size is over the limit before reading them"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        return OrjsonResponse(status_code=413, content={"detail": "Request too large"})
+    return await call_next(request)
+
+
+# Added last so it is the outermost middleware: responses from the size
+# check above (e.g. 413) still get CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -95,116 +178,141 @@ async def analyze_pronunciation(request: AnalyzeRequest):
     5. Compare features segment by segment
     6. Generate feedback report
     """
-    import traceback
+    log.info("[1/6] Decoding audio for %d:%d...", request.surah, request.ayah)
+    if len(request.audio_base64) > MAX_AUDIO_BASE64:
+        raise HTTPException(status_code=413, detail="Audio too large")
 
+    # Decode user audio
     try:
-        print(f"[1/7] Decoding audio for {request.surah}:{request.ayah}...")
-        # Decode user audio
         audio_bytes = base64.b64decode(request.audio_base64)
-        print(f"      Audio size: {len(audio_bytes)} bytes")
-
-        print(f"[2/7] Fetching reference audio and word timings (qari: {request.qari})...")
-        # Get reference audio AND word-level timestamps for this ayah
-        reference_audio, word_timings = await get_reference_with_timings(
-            surah=request.surah,
-            ayah=request.ayah,
-            qari=request.qari
+    except binascii.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid base64 audio: {e}")
+
+    log.debug("      Audio size: %d bytes", len(audio_bytes))
+
+    return await analyze_audio(audio_bytes, request.surah, request.ayah, request.qari)
+
+
+@app.post("/analyze-binary", response_model=AnalyzeResponse)
+async def analyze_pronunciation_binary(
+    file: UploadFile = File(...),
+    surah: int = Form(...),
+    ayah: int = Form(...),
+    qari: str = Form("ar.husary"),
+):
+    """
+    Analyze pronunciation quality from a multipart audio file upload.
+
+    Same analysis as /analyze, but the recording is sent as raw bytes, so
+    neither the base64 text nor a decoded copy of it is held in memory.
+    """
+    log.info("[1/6] Reading uploaded audio for %d:%d...", surah, ayah)
+    # Read at most one byte past the limit, enough to tell it was exceeded
+    audio_bytes = await file.read(MAX_AUDIO_BYTES + 1)
+    if len(audio_bytes) > MAX_AUDIO_BYTES:
+        raise HTTPException(status_code=413, detail="Audio too large")
+    log.debug("      Audio size: %d bytes", len(audio_bytes))
+
+    return await analyze_audio(audio_bytes, surah, ayah, qari)
+
+
+async def analyze_audio(
+    audio_bytes: bytes,
+    surah: int,
+    ayah: int,
+    qari: str
+) -> OrjsonResponse:
+    """Run steps 2-6 of the analysis on decoded user audio"""
+    try:
+        log.info("[2/6] Fetching reference features and word timings (qari: %s)...", qari)
+        # Get the reference audio features (extracted once, then cached on
+        # disk) AND word-level timestamps for this ayah
+        reference_task = asyncio.create_task(get_reference_with_timings(
+            surah=surah,
+            ayah=ayah,
+            qari=qari
+        ))
+
+        log.info("[3/6] Extracting user audio features (while fetching reference)...")
+        # Feature extraction is CPU-bound (NumPy/librosa release the GIL), so
+        # run it in a worker thread and overlap it with the network fetch
+        user_features_task = asyncio.create_task(
+            asyncio.to_thread(extract_features, audio_bytes)
         )
 
-        if reference_audio is None:
+        try:
+            (ref_features, word_timings), user_features = await asyncio.gather(
+                reference_task, user_features_task
+            )
+        except BaseException:
+            # gather doesn't cancel the sibling: stop the reference fetch
+            # (e.g. when the user audio can't be decoded) rather than leave
+            # it running unobserved
+            reference_task.cancel()
+            user_features_task.cancel()
+            raise
+
+        if ref_features is None:
             raise HTTPException(
                 status_code=404,
-                detail=f"Reference audio not found for {request.surah}:{request.ayah}"
+                detail=f"Reference audio not found for {surah}:{ayah}"
             )
-        print(f"      Reference size: {len(reference_audio)} bytes")
-        print(f"      Word timings: {len(word_timings) if word_timings else 0} words")
-
-        print("[3/7] Extracting user audio features...")
-        # Extract features from both recordings
-        user_features = extract_features(audio_bytes)
-        print(f"      User features: {user_features.n_frames} frames, {user_features.duration:.2f}s")
-
-        print("[4/7] Extracting reference audio features...")
-        ref_features = extract_features(reference_audio)
-        print(f"      Ref features: {ref_features.n_frames} frames, {ref_features.duration:.2f}s")
+        log.debug("      Ref features: %d frames, %.2fs", ref_features.n_frames, ref_features.duration)
+        log.debug("      Word timings: %d words", len(word_timings) if word_timings else 0)
+        log.debug("      User features: %d frames, %.2fs", user_features.n_frames, user_features.duration)
 
-        print("[5/7] Aligning audio with DTW...")
+        log.info("[4/6] Aligning audio with DTW...")
         # Align the two recordings using DTW
-        alignment = align_audio_features(user_features, ref_features)
-        print(f"      Alignment distance: {alignment.normalized_distance:.4f}")
+        # The DTW and scoring kernels are CPU-bound too, so keep them off the
+        # event loop like the feature extraction above
+        alignment = await asyncio.to_thread(align_audio_features, user_features, ref_features)
+        log.debug("      Alignment distance: %.4f", alignment.normalized_distance)
 
-        print("[6/7] Comparing segments and generating report...")
+        log.info("[5/6] Comparing segments and generating report...")
         # Compare and generate report (segment-based)
-        report = compare_recitations(user_features, ref_features, alignment)
-        print(f"      Scores - Overall: {report.overall_score:.1f}, Makhraj: {report.makhraj_score:.1f}")
+        report = await asyncio.to_thread(compare_recitations, user_features, ref_features, alignment)
+        log.debug("      Scores - Overall: %.1f, Makhraj: %.1f", report.overall_score, report.makhraj_score)
 
-        print("[7/7] Analyzing word-by-word pronunciation...")
+        log.info("[6/6] Analyzing word-by-word pronunciation...")
         # Word-by-word comparison using timing data
         word_feedback_list = []
         if word_timings:
-            word_feedback_list = compare_word_by_word(
+            word_feedback_list = await asyncio.to_thread(
+                compare_word_by_word,
                 user_features=user_features,
                 ref_features=ref_features,
                 alignment=alignment,
                 word_timings=word_timings
             )
-            print(f"      Analyzed {len(word_feedback_list)} words")
-            issues_count = sum(1 for w in word_feedback_list if w.get('issues'))
-            print(f"      Words with issues: {issues_count}")
-
-        # Convert dataclass segments to Pydantic-compatible dicts
-        segments = [
-            SegmentFeedback(
-                start_time=s.start_time,
-                end_time=s.end_time,
-                makhraj_score=s.makhraj_score,
-                timing_score=s.timing_score,
-                overall_score=s.overall_score,
-                issues=s.issues
-            )
-            for s in report.segments
-        ]
-
-        # Convert word feedback to Pydantic models
-        words = [
-            WordFeedback(
-                word_index=w['word_index'],
-                text=w['text'],
-                start_time=w['start_time'],
-                end_time=w['end_time'],
-                makhraj_score=w['makhraj_score'],
-                timing_score=w['timing_score'],
-                overall_score=w['overall_score'],
-                issues=w['issues']
-            )
-            for w in word_feedback_list
-        ]
-
-        return AnalyzeResponse(
-            overall_score=report.overall_score,
-            makhraj_score=report.makhraj_score,
-            timing_score=report.timing_score,
-            fluency_score=report.fluency_score,
-            segments=segments,
-            words=words,
-            summary=report.summary
-        )
+            log.debug("      Analyzed %d words", len(word_feedback_list))
+            if log.isEnabledFor(logging.DEBUG):
+                issues_count = sum(1 for w in word_feedback_list if w.get('issues'))
+                log.debug("      Words with issues: %d", issues_count)
+
+        # Serialize plain dicts directly; the Pydantic models above only
+        # document the response schema, so per-word models aren't built
+        return OrjsonResponse({
+            "overall_score": report.overall_score,
+            "makhraj_score": report.makhraj_score,
+            "timing_score": report.timing_score,
+            "fluency_score": report.fluency_score,
+            "segments": [asdict(s) for s in report.segments],
+            "words": word_feedback_list,
+            "summary": report.summary,
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR: {type(e).__name__}: {e}")
-        traceback.print_exc()
+        log.exception("ERROR: %s: %s", type(e).__name__, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/reference/{surah}/{ayah}")
 async def check_reference(surah: int, ayah: int, qari: str = "ar.alafasy"):
     """Check if reference audio is available for an ayah"""
-    audio = await get_reference_audio(surah, ayah, qari)
-    if audio:
-        return {"available": True, "surah": surah, "ayah": ayah, "qari": qari}
-    return {"available": False, "surah": surah, "ayah": ayah, "qari": qari}
+    available = await is_reference_available(surah, ayah, qari)
+    return {"available": available, "surah": surah, "ayah": ayah, "qari": qari}
 
 
 if __name__ == "__main__":
@@ -7,17 +7,66 @@ Uses Quran.com API for word-level timestamps.
 """
 
 import asyncio
-import json
+import hashlib
+import logging
+import uuid
 from pathlib import Path
 from typing import Optional
 
 import httpx
 import aiofiles
+import aiofiles.os
+import numpy as np
+import orjson
+from aiofiles.os import path as aio_path
+
+from features import (
+    FEATURES_VERSION,
+    AudioFeatures,
+    extract_features,
+    load_features,
+    save_features,
+)
+
+try:
+    import zstandard
+except ImportError:  # Optional: the timestamps cache is stored uncompressed
+    zstandard = None
+
+__all__ = [
+    "AYAH_COUNTS",
+    "CACHE_DIR",
+    "QARIS",
+    "QURANWBW_RECITERS",
+    "clear_cache",
+    "close_http_client",
+    "fetch_quranwbw_timestamps",
+    "get_audio_url",
+    "get_blob_path",
+    "get_cache_path",
+    "get_features_path",
+    "get_http_client",
+    "get_reference_audio",
+    "get_reference_audio_path",
+    "get_reference_features",
+    "get_reference_with_timings",
+    "get_word_timings",
+    "is_reference_available",
+    "list_available_qaris",
+    "load_verse_timestamps",
+    "parse_word_times",
+    "prefetch_surah",
+]
+
+log = logging.getLogger(__name__)
 
 # Cache directory for downloaded audio
 CACHE_DIR = Path(__file__).parent / ".audio_cache"
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Audio blobs, stored by URL hash (see get_blob_path)
+BLOB_DIR = CACHE_DIR / "blobs"
+
 # Available Qaris from EveryAyah.com
 # Format: identifier -> folder name on everyayah.com
 QARIS = {
@@ -31,6 +80,49 @@ QARIS = {
 # Base URL for EveryAyah
 EVERYAYAH_BASE = "https://everyayah.com/data"
 
+# Number of ayahs in each surah, indexed by surah number (index 0 unused)
+AYAH_COUNTS: tuple[int, ...] = (
+    0, 7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99,
+    128, 111, 110, 98, 135, 112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34,
+    30, 73, 54, 45, 83, 182, 88, 75, 85, 54, 53, 89, 59, 37, 35, 38, 29,
+    18, 45, 60, 49, 62, 55, 78, 96, 29, 22, 24, 13, 14, 11, 11, 18, 12, 12,
+    30, 52, 52, 44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42, 29, 19, 36, 25,
+    22, 17, 19, 26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11, 11, 8, 3, 9,
+    5, 4, 7, 3, 6, 3, 5, 4, 5, 6,
+)
+
+# Chunk size when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Maximum concurrent downloads when prefetching a whole surah
+PREFETCH_CONCURRENCY = 16
+
+# Shared HTTP client, so connections (and TLS sessions) are reused
+# across requests instead of being set up for every fetch
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call on application shutdown)"""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def get_audio_url(surah: int, ayah: int, qari: str = "ar.husary") -> str:
     """
@@ -43,9 +135,104 @@ def get_audio_url(surah: int, ayah: int, qari: str = "ar.husary") -> str:
     return f"{EVERYAYAH_BASE}/{qari_folder}/{filename}"
 
 
+def _url_hash(url: str) -> str:
+    """Short SHA-256 digest of a URL, used as its cache key"""
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def get_blob_path(url_hash: str) -> Path:
+    """Get the local path of a cached audio blob from its URL hash"""
+    return BLOB_DIR / url_hash[:2] / f"{url_hash}.mp3"
+
+
 def get_cache_path(surah: int, ayah: int, qari: str) -> Path:
-    """Get the local cache path for an ayah's audio"""
-    return CACHE_DIR / f"{qari}_{surah:03d}_{ayah:03d}.mp3"
+    """
+    Get the local cache path for an ayah's audio.
+
+    Audio is cached by the hash of its source URL, so qari identifiers that
+    resolve to the same EveryAyah folder (e.g. unknown qaris falling back to
+    Husary) share one file instead of each caching a copy.
+    """
+    return get_blob_path(_url_hash(get_audio_url(surah, ayah, qari)))
+
+
+async def _write_cache_file(path: Path, data: bytes) -> None:
+    """
+    Write a cache file through a temporary .part file renamed into place,
+    so an interrupted or cancelled write never leaves a truncated file.
+    """
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.part")
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        await aiofiles.os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+async def _download_to_cache(url: str, cache_path: Path) -> bool:
+    """
+    Stream a download straight into the cache, chunk by chunk.
+
+    The body is written to a temporary .part file that is renamed into
+    place once complete, so the whole file is never held in memory and an
+    interrupted download never leaves a truncated cache entry.
+
+    Returns True if the file was downloaded.
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex[:8]}.part")
+
+    try:
+        async with get_http_client().stream("GET", url) as response:
+            response.raise_for_status()
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+
+        await aiofiles.os.replace(tmp_path, cache_path)
+        return True
+
+    except httpx.HTTPStatusError as e:
+        log.warning("Failed to fetch reference audio: %s", e)
+        return False
+    except httpx.RequestError as e:
+        log.warning("Network error fetching reference audio: %s", e)
+        return False
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+async def get_reference_audio_path(
+    surah: int,
+    ayah: int,
+    qari: str = "ar.husary"
+) -> Optional[Path]:
+    """
+    Get the local path of an ayah's reference audio.
+
+    Downloads into the cache first if needed. Pass the path to
+    extract_features to decode the file directly instead of reading it
+    into memory.
+
+    Returns:
+        Cache path or None if not available
+    """
+    # Validate inputs
+    if surah < 1 or surah > 114:
+        return None
+    if ayah < 1:
+        return None
+
+    # Check cache first, then download from EveryAyah
+    cache_path = get_cache_path(surah, ayah, qari)
+    if await aio_path.exists(cache_path):
+        return cache_path
+
+    if await _download_to_cache(get_audio_url(surah, ayah, qari), cache_path):
+        return cache_path
+    return None
 
 
 async def get_reference_audio(
@@ -66,79 +253,112 @@ async def get_reference_audio(
     Returns:
         Audio bytes or None if not available
     """
-    # Validate inputs
-    if surah < 1 or surah > 114:
-        return None
-    if ayah < 1:
+    cache_path = await get_reference_audio_path(surah, ayah, qari)
+    if cache_path is None:
         return None
 
-    # Check cache first
-    cache_path = get_cache_path(surah, ayah, qari)
-    if cache_path.exists():
-        async with aiofiles.open(cache_path, "rb") as f:
-            return await f.read()
+    async with aiofiles.open(cache_path, "rb") as f:
+        return await f.read()
 
-    # Download from EveryAyah
-    url = get_audio_url(surah, ayah, qari)
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
+def get_features_path(surah: int, ayah: int, qari: str) -> Path:
+    """Get the local cache path for an ayah's extracted features (next to its audio)"""
+    # Keyed by FEATURES_VERSION, so features from an older extraction are
+    # never paired with freshly extracted user features
+    return get_cache_path(surah, ayah, qari).with_suffix(f".features-v{FEATURES_VERSION}.npz")
 
-            audio_bytes = response.content
 
-            # Cache for future use
-            async with aiofiles.open(cache_path, "wb") as f:
-                await f.write(audio_bytes)
+async def get_reference_features(
+    surah: int,
+    ayah: int,
+    qari: str = "ar.husary"
+) -> Optional[AudioFeatures]:
+    """
+    Get the extracted features of an ayah's reference audio.
 
-            return audio_bytes
+    The reference never changes, so features are extracted once and cached
+    as .npz next to the audio; later calls skip decoding and extraction.
 
-    except httpx.HTTPStatusError as e:
-        print(f"Failed to fetch reference audio: {e}")
+    Returns:
+        AudioFeatures or None if the audio is not available
+    """
+    features_path = get_features_path(surah, ayah, qari)
+    if await aio_path.exists(features_path):
+        try:
+            return await asyncio.to_thread(load_features, features_path)
+        except Exception as e:
+            log.warning("Ignoring unreadable features cache %s: %s", features_path, e)
+
+    audio_path = await get_reference_audio_path(surah, ayah, qari)
+    if audio_path is None:
         return None
+
+    # Decoded straight from the cache file, without reading it into memory
+    features = await asyncio.to_thread(extract_features, audio_path)
+    await asyncio.to_thread(save_features, features, features_path)
+    return features
+
+
+async def is_reference_available(
+    surah: int,
+    ayah: int,
+    qari: str = "ar.husary"
+) -> bool:
+    """
+    Check whether reference audio exists for an ayah without downloading it.
+
+    Cached ayahs are available; otherwise a HEAD request asks EveryAyah.
+    """
+    # Validate inputs
+    if surah < 1 or surah > 114:
+        return False
+    if ayah < 1:
+        return False
+
+    if await aio_path.exists(get_cache_path(surah, ayah, qari)):
+        return True
+
+    try:
+        response = await get_http_client().head(get_audio_url(surah, ayah, qari))
+        return response.status_code == 200
     except httpx.RequestError as e:
-        print(f"Network error fetching reference audio: {e}")
-        return None
+        log.warning("Network error checking reference audio: %s", e)
+        return False
 
 
-async def prefetch_surah(surah: int, qari: str = "ar.husary") -> int:
+async def prefetch_surah(
+    surah: int,
+    qari: str = "ar.husary",
+    max_concurrency: int = PREFETCH_CONCURRENCY
+) -> int:
     """
     Pre-download all ayahs for a surah.
 
+    Ayahs are downloaded concurrently, at most max_concurrency at a time.
+
     Returns the number of successfully downloaded ayahs.
     """
     # Get ayah count for this surah
-    ayah_counts = {
-        1: 7, 2: 286, 3: 200, 4: 176, 5: 120, 6: 165, 7: 206, 8: 75,
-        9: 129, 10: 109, 11: 123, 12: 111, 13: 43, 14: 52, 15: 99,
-        16: 128, 17: 111, 18: 110, 19: 98, 20: 135, 21: 112, 22: 78,
-        23: 118, 24: 64, 25: 77, 26: 227, 27: 93, 28: 88, 29: 69,
-        30: 60, 31: 34, 32: 30, 33: 73, 34: 54, 35: 45, 36: 83,
-        37: 182, 38: 88, 39: 75, 40: 85, 41: 54, 42: 53, 43: 89,
-        44: 59, 45: 37, 46: 35, 47: 38, 48: 29, 49: 18, 50: 45,
-        51: 60, 52: 49, 53: 62, 54: 55, 55: 78, 56: 96, 57: 29,
-        58: 22, 59: 24, 60: 13, 61: 14, 62: 11, 63: 11, 64: 18,
-        65: 12, 66: 12, 67: 30, 68: 52, 69: 52, 70: 44, 71: 28,
-        72: 28, 73: 20, 74: 56, 75: 40, 76: 31, 77: 50, 78: 40,
-        79: 46, 80: 42, 81: 29, 82: 19, 83: 36, 84: 25, 85: 22,
-        86: 17, 87: 19, 88: 26, 89: 30, 90: 20, 91: 15, 92: 21,
-        93: 11, 94: 8, 95: 8, 96: 19, 97: 5, 98: 8, 99: 8,
-        100: 11, 101: 11, 102: 8, 103: 3, 104: 9, 105: 5, 106: 4,
-        107: 7, 108: 3, 109: 6, 110: 3, 111: 5, 112: 4, 113: 5, 114: 6,
-    }
-
-    total_ayahs = ayah_counts.get(surah, 0)
+    total_ayahs = AYAH_COUNTS[surah] if 1 <= surah <= 114 else 0
     if total_ayahs == 0:
         return 0
 
-    downloaded = 0
-    for ayah in range(1, total_ayahs + 1):
-        audio = await get_reference_audio(surah, ayah, qari)
-        if audio:
-            downloaded += 1
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Only make sure each ayah is on disk; nothing is read back into memory
+    async def fetch_ayah(ayah: int) -> Optional[Path]:
+        async with semaphore:
+            return await get_reference_audio_path(surah, ayah, qari)
+
+    results = await asyncio.gather(
+        *(fetch_ayah(ayah) for ayah in range(1, total_ayahs + 1)),
+        return_exceptions=True
+    )
 
-    return downloaded
+    return sum(
+        1 for path in results
+        if path is not None and not isinstance(path, BaseException)
+    )
 
 
 def list_available_qaris() -> dict[str, str]:
@@ -153,11 +373,20 @@ def list_available_qaris() -> dict[str, str]:
 
 
 def clear_cache() -> int:
-    """Clear the audio cache. Returns number of files deleted."""
+    """Clear the audio and features cache. Returns number of files deleted."""
     count = 0
-    for file in CACHE_DIR.glob("*.mp3"):
-        file.unlink()
-        count += 1
+    for pattern in ("*/*.mp3", "*/*.npz"):
+        for file in BLOB_DIR.glob(pattern):
+            file.unlink()
+            count += 1
+
+    # Audio cached before the switch to URL-hash blobs (flat
+    # <qari>_<surah>_<ayah>.mp3, or per-qari folders) is never looked up
+    # again, so remove it too
+    for pattern in ("*.mp3", "*/*.mp3"):
+        for file in CACHE_DIR.glob(pattern):
+            file.unlink()
+            count += 1
     return count
 
 
@@ -174,40 +403,191 @@ QURANWBW_RECITERS = {
 # QuranWBW static data endpoint
 QURANWBW_STATIC = "https://static.quranwbw.com/data/v4"
 
-# Cache for timestamps (loaded once)
-_timestamps_cache = None
+# Quran.com API endpoint for verse word text
+QURAN_COM_API = "https://api.quran.com/api/v4"
 
+# Quran.com caps per_page at 50 verses, so longer surahs span several pages
+QURAN_COM_PAGE_SIZE = 50
+
+# Word texts per surah, keyed by verse number (fetched once per surah)
+_surah_words: dict[int, dict[int, tuple[str, ...]]] = {}
+_surah_words_locks: dict[int, asyncio.Lock] = {}
+
+# Word timings already built in this process, keyed by (surah, ayah, reciter_id)
+_word_timings: dict[tuple[int, int, int], list[dict]] = {}
+
+# Timestamps flattened to (surah, ayah, reciter_id) -> "t0|t1|..." (built once)
+_verse_timestamps: Optional[dict[tuple[int, int, int], str]] = None
+_verse_timestamps_lock = asyncio.Lock()
 
-async def fetch_quranwbw_timestamps() -> Optional[dict]:
-    """Fetch and cache the QuranWBW timestamps file."""
-    global _timestamps_cache
 
-    if _timestamps_cache is not None:
-        return _timestamps_cache
+async def fetch_quranwbw_timestamps() -> Optional[dict]:
+    """
+    Read the QuranWBW timestamps file, downloading it into the local cache
+    first if needed.
 
-    # Check local cache
+    The parsed payload is not kept in memory: load_verse_timestamps builds
+    (and keeps) the flattened index from it, so the multi-MB nested dict can
+    be freed once that is done.
+    """
+    # Check local cache (zstd-compressed when zstandard is installed)
     cache_path = CACHE_DIR / "quranwbw_timestamps.json"
-    if cache_path.exists():
-        async with aiofiles.open(cache_path, "r") as f:
-            content = await f.read()
-            _timestamps_cache = json.loads(content)
-            return _timestamps_cache
+    zst_path = CACHE_DIR / "quranwbw_timestamps.json.zst"
+    try:
+        if zstandard is not None and await aio_path.exists(zst_path):
+            async with aiofiles.open(zst_path, "rb") as f:
+                content = zstandard.ZstdDecompressor().decompress(await f.read())
+                return orjson.loads(content)
+        if await aio_path.exists(cache_path):
+            async with aiofiles.open(cache_path, "rb") as f:
+                content = await f.read()
+                return orjson.loads(content)
+    except Exception as e:
+        # A corrupt cache must not stop startup: drop it and refetch
+        log.warning("Discarding unreadable QuranWBW timestamps cache: %s", e)
+        zst_path.unlink(missing_ok=True)
+        cache_path.unlink(missing_ok=True)
 
     # Fetch from QuranWBW
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(f"{QURANWBW_STATIC}/timestamps/timestamps.json")
+        response = await get_http_client().get(
+            f"{QURANWBW_STATIC}/timestamps/timestamps.json",
+            timeout=60.0
+        )
+        response.raise_for_status()
+        timestamps_data = orjson.loads(response.content)
+
+        # Cache locally (the raw payload is already JSON, no need to re-encode).
+        # The file is several MB of ASCII, which zstd shrinks ~5x.
+        if zstandard is not None:
+            await _write_cache_file(
+                zst_path, zstandard.ZstdCompressor(level=9).compress(response.content)
+            )
+        else:
+            await _write_cache_file(cache_path, response.content)
+
+        return timestamps_data
+    except Exception as e:
+        log.warning("Failed to fetch QuranWBW timestamps: %s", e)
+        return None
+
+
+async def load_verse_timestamps() -> Optional[dict[tuple[int, int, int], str]]:
+    """
+    Get the QuranWBW timestamps keyed by (surah, ayah, reciter_id).
+
+    The nested JSON is flattened on first use, so each lookup is a single
+    dict probe. Call at startup to keep the download/parse off the request
+    path.
+
+    Concurrent callers on a cold cache share a single load: the first one
+    reads or downloads the file while the rest wait on the lock and then
+    reuse its result.
+    """
+    global _verse_timestamps
+
+    if _verse_timestamps is not None:
+        return _verse_timestamps
+
+    async with _verse_timestamps_lock:
+        if _verse_timestamps is not None:
+            return _verse_timestamps
+
+        timestamps_data = await fetch_quranwbw_timestamps()
+        if not timestamps_data:
+            return None
+
+        _verse_timestamps = {
+            (int(surah), int(ayah), int(reciter_id)): timestamps
+            for surah, ayahs in timestamps_data.get("data", {}).items()
+            for ayah, reciters in ayahs.items()
+            for reciter_id, timestamps in reciters.items()
+        }
+        return _verse_timestamps
+
+
+async def _fetch_surah_words(surah: int) -> dict[int, tuple[str, ...]]:
+    """
+    Get the Uthmani text of the words of every verse in a surah from
+    Quran.com, keyed by verse number.
+
+    The whole surah is fetched with the by_chapter endpoint (one request per
+    page of verses) instead of one by_key request per ayah. Only the texts
+    of actual words are kept (verse-end markers and other signs are
+    dropped), so the in-memory cache stays small; concurrent callers for
+    the same surah share a single fetch.
+    """
+    words = _surah_words.get(surah)
+    if words is not None:
+        return words
+
+    async with _surah_words_locks.setdefault(surah, asyncio.Lock()):
+        words = _surah_words.get(surah)
+        if words is not None:
+            return words
+
+        client = get_http_client()
+        url = f"{QURAN_COM_API}/verses/by_chapter/{surah}"
+
+        async def fetch_page(page: int) -> dict:
+            response = await client.get(url, params={
+                "words": "true",
+                "word_fields": "text_uthmani",
+                "per_page": QURAN_COM_PAGE_SIZE,
+                "page": page,
+            })
             response.raise_for_status()
-            _timestamps_cache = response.json()
+            return orjson.loads(response.content)
+
+        first = await fetch_page(1)
+        total_pages = first.get("pagination", {}).get("total_pages") or 1
+        pages = [first, *await asyncio.gather(
+            *(fetch_page(page) for page in range(2, total_pages + 1))
+        )]
+
+        words = {
+            verse["verse_number"]: tuple(
+                word.get("text_uthmani", word.get("text", ""))
+                for word in verse.get("words", [])
+                if word.get("char_type_name") == "word"
+            )
+            for page in pages
+            for verse in page.get("verses", [])
+        }
+        log.debug("  Fetched words for %d verses of surah %d", len(words), surah)
+
+        _surah_words[surah] = words
+        return words
+
+
+def parse_word_times(verse_timestamps: str, n_words: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a QuranWBW "t0|t1|..." start-time string (seconds) into per-word
+    start/end times in milliseconds.
 
-            # Cache locally
-            async with aiofiles.open(cache_path, "w") as f:
-                await f.write(json.dumps(_timestamps_cache))
+    Each word ends where the next one starts; the last timed word is given
+    0.5s. Empty entries count as 0, and words beyond the timestamps get
+    0-500ms.
 
-            return _timestamps_cache
-    except Exception as e:
-        print(f"Failed to fetch QuranWBW timestamps: {e}")
-        return None
+    Returns:
+        (start_ms, end_ms) int64 arrays of length n_words
+    """
+    times = np.zeros(0)
+    if verse_timestamps:
+        tokens = np.array(verse_timestamps.split("|"))
+        times = np.where(tokens == "", "0", tokens).astype(np.float64)
+    log.debug("  Parsed %d word timestamps: %s...", len(times), times[:5])
+
+    n_timed = min(len(times), n_words)
+    start_sec = np.zeros(n_words)
+    start_sec[:n_timed] = times[:n_timed]
+
+    # End time is start of next word (or estimate)
+    end_sec = start_sec + 0.5
+    n_next = max(0, min(len(times) - 1, n_words))
+    end_sec[:n_next] = times[1:n_next + 1]
+
+    return (start_sec * 1000).astype(np.int64), (end_sec * 1000).astype(np.int64)
 
 
 async def get_word_timings(
@@ -226,95 +606,72 @@ async def get_word_timings(
     ]
     """
     reciter_id = QURANWBW_RECITERS.get(qari, 8)  # Default to Husary (ID 8)
+    key = (surah, ayah, reciter_id)
+
+    # Check the in-memory cache, then the disk cache
+    result = _word_timings.get(key)
+    if result is not None:
+        return result
 
-    # Check cache first
     cache_path = CACHE_DIR / f"wordtiming_{surah}_{ayah}_{reciter_id}.json"
-    if cache_path.exists():
-        async with aiofiles.open(cache_path, "r") as f:
-            content = await f.read()
-            return json.loads(content)
+    if await aio_path.exists(cache_path):
+        try:
+            async with aiofiles.open(cache_path, "rb") as f:
+                content = await f.read()
+            result = _word_timings[key] = orjson.loads(content)
+            return result
+        except Exception as e:
+            # Drop a corrupt cache file and rebuild it below
+            log.warning("Discarding unreadable word timing cache %s: %s", cache_path, e)
+            cache_path.unlink(missing_ok=True)
 
     try:
         # Fetch timestamps data
-        timestamps_data = await fetch_quranwbw_timestamps()
-        if not timestamps_data:
+        verse_timestamps_index = await load_verse_timestamps()
+        if not verse_timestamps_index:
             return None
 
-        # Get word text from Quran.com API
-        words_url = f"https://api.quran.com/api/v4/verses/by_key/{surah}:{ayah}?words=true&word_fields=text_uthmani"
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            words_response = await client.get(words_url)
-            words_response.raise_for_status()
-            words_data = words_response.json()
-
-        words = words_data.get("verse", {}).get("words", [])
-        print(f"  Fetched {len(words)} words from Quran.com API")
+        # Get word text from Quran.com API (fetched for the whole surah)
+        surah_words = await _fetch_surah_words(surah)
+        words = surah_words.get(ayah, ())
+        log.debug("  Fetched %d words from Quran.com API", len(words))
 
         # Get timestamps for this verse from QuranWBW
-        verse_timestamps = (
-            timestamps_data.get("data", {})
-            .get(str(surah), {})
-            .get(str(ayah), {})
-            .get(str(reciter_id), "")
-        )
+        verse_timestamps = verse_timestamps_index.get(key, "")
 
         if not verse_timestamps:
-            print(f"  No timestamps found for {surah}:{ayah} reciter {reciter_id}")
+            log.debug("  No timestamps found for %d:%d reciter %d", surah, ayah, reciter_id)
             # Try fallback to Husary
             if reciter_id != 8:
-                verse_timestamps = (
-                    timestamps_data.get("data", {})
-                    .get(str(surah), {})
-                    .get(str(ayah), {})
-                    .get("8", "")
-                )
-
-        # Parse pipe-separated start times (in seconds)
-        start_times = []
-        if verse_timestamps:
-            start_times = [float(t) if t and t != "0" else 0.0 for t in verse_timestamps.split("|")]
-        print(f"  Parsed {len(start_times)} word timestamps: {start_times[:5]}...")
+                verse_timestamps = verse_timestamps_index.get((surah, ayah, 8), "")
 
         # Combine words with timing
-        result = []
-        word_idx = 0
-        for i, word in enumerate(words):
-            # Skip end markers (verse number at end)
-            if word.get("char_type_name") == "end":
-                continue
-
-            word_text = word.get("text_uthmani", word.get("text", ""))
-
-            # Get start time for this word
-            start_sec = start_times[word_idx] if word_idx < len(start_times) else 0
-            # End time is start of next word (or estimate)
-            end_sec = start_times[word_idx + 1] if word_idx + 1 < len(start_times) else start_sec + 0.5
-
-            # Convert to milliseconds
-            start_ms = int(start_sec * 1000)
-            end_ms = int(end_sec * 1000)
-
-            print(f"  Word {word_idx}: '{word_text}' {start_ms}ms - {end_ms}ms")
+        start_ms, end_ms = parse_word_times(verse_timestamps, len(words))
 
-            result.append({
+        result = [
+            {
                 "word_index": word_idx,
-                "text": word_text,
-                "start_ms": start_ms,
-                "end_ms": end_ms,
-            })
-            word_idx += 1
-
-        # Cache the result
-        async with aiofiles.open(cache_path, "w") as f:
-            await f.write(json.dumps(result, ensure_ascii=False))
-
+                "text": text,
+                "start_ms": start,
+                "end_ms": end,
+            }
+            for word_idx, (text, start, end) in enumerate(
+                zip(words, start_ms.tolist(), end_ms.tolist())
+            )
+        ]
+        if log.isEnabledFor(logging.DEBUG):
+            for word in result:
+                log.debug("  Word %d: '%s' %dms - %dms", word["word_index"],
+                          word["text"], word["start_ms"], word["end_ms"])
+
+        # Cache the result (orjson writes UTF-8, so Arabic text stays readable)
+        await _write_cache_file(cache_path, orjson.dumps(result))
+
+        _word_timings[key] = result
         return result
 
     except Exception as e:
-        print(f"Failed to fetch word timings: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Failed to fetch word timings: %s", e)
         return None
 
 
@@ -322,16 +679,32 @@ async def get_reference_with_timings(
     surah: int,
     ayah: int,
     qari: str = "ar.husary"
-) -> tuple[Optional[bytes], Optional[list[dict]]]:
+) -> tuple[Optional[AudioFeatures], Optional[list[dict]]]:
     """
-    Get both reference audio and word-level timestamps.
+    Get both reference audio features and word-level timestamps.
 
-    Returns (audio_bytes, word_timings)
+    Returns (audio_features, word_timings). Word timings are optional for
+    the analysis, so a failed timing fetch gives None instead of an error;
+    if the audio is unavailable or fails, the timing fetch is cancelled.
     """
     # Fetch both in parallel
-    audio_task = get_reference_audio(surah, ayah, qari)
-    timing_task = get_word_timings(surah, ayah, qari)
+    audio_task = asyncio.create_task(get_reference_features(surah, ayah, qari))
+    timing_task = asyncio.create_task(get_word_timings(surah, ayah, qari))
+
+    try:
+        audio = await audio_task
+    except BaseException:
+        timing_task.cancel()
+        raise
+
+    if audio is None:
+        timing_task.cancel()
+        return None, None
 
-    audio, timings = await asyncio.gather(audio_task, timing_task)
+    try:
+        timings = await timing_task
+    except Exception as e:
+        log.warning("Word timings unavailable for %d:%d: %s", surah, ayah, e)
+        timings = None
 
     return audio, timings